@@ -1,14 +1,26 @@
 import os
 import asyncio
-import pandas as pd
+import functools
+import hashlib
+import threading
+import time
+from collections import deque
+import numpy as np
 import sqlite3
 import json
 import streamlit as st
 import re
-import requests
+import httpx
 from datetime import datetime
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+# Optional Redis backing for the completion caches
+try:
+    import redis.asyncio as redis_async
+except ImportError:
+    redis_async = None
 
 # ============================================================================
 # CONFIGURATION AND SETUP
@@ -24,7 +36,7 @@ if not OPENAI_API_KEY:
     st.stop()
 
 # Initialize OpenAI client
-client = OpenAI(api_key=OPENAI_API_KEY)
+client = AsyncOpenAI(api_key=OPENAI_API_KEY)
 
 # Documentation Repository Configuration
 GITHUB_REPO_BASE = "https://raw.githubusercontent.com/Renda02/tech-101-handbook/main"
@@ -39,110 +51,514 @@ DOCUMENTATION_URLS = {
 # Database Configuration
 DB_FILE = os.getenv("DB_FILE", "editorial_reviews.db")
 
-# Cache for documentation content
-DOCS_CACHE = {}
 CACHE_EXPIRY = 3600  # 1 hour in seconds
 
+# Cache for documentation content. Held via cache_resource so entries —
+# and the ETags that make 304 revalidation possible — survive reruns; a
+# module global would start empty every run and re-download all guides.
+@st.cache_resource(show_spinner=False)
+def _docs_cache():
+    """Documentation cache shared across reruns."""
+    return {}
+
+DOCS_CACHE = _docs_cache()
+
+# Semantic cache configuration
+EMBEDDING_MODEL = "text-embedding-3-small"
+SEMANTIC_CACHE_THRESHOLD = 0.95
+
+# Global cap on in-flight completion calls; bursts above OpenAI tier limits
+# just trigger 429 retries, each costing a full round trip
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+# Redis cache backing (optional). When REDIS_URL is set, completion cache
+# entries are shared across Streamlit reruns and workers; otherwise the
+# caches stay process-local.
+REDIS_URL = os.getenv("REDIS_URL")
+
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
+@st.cache_resource(show_spinner=False)
+def _system_logs():
+    """Process-wide log ring buffer.
+
+    Most log calls happen in coroutines on the background loop, where
+    st.session_state resolves to a context-less mock and writes vanish —
+    so the buffer lives at process scope instead of in the session.
+    """
+    return deque(maxlen=64)
+
+# Resolved here, on the script thread, so coroutines and worker threads
+# append without touching Streamlit's cache machinery contextless
+_LOG_BUFFER = _system_logs()
+
 def log_system_message(message):
-    """Add a timestamped message to system logs."""
-    if 'system_logs' not in st.session_state:
-        st.session_state['system_logs'] = []
-    
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    st.session_state['system_logs'].append(f"[{timestamp}] {message}")
+    """Record a system log entry in the bounded ring buffer.
+
+    Entries are stored as (epoch, message) tuples; any display formatting
+    happens at render time, and only for the handful of entries shown.
+    """
+    _LOG_BUFFER.append((time.time(), message))
+
+# Prompt excerpt lengths used by the agents; slices are cut once at fetch time
+# so prompt assembly is a dict read instead of a fresh copy per agent call.
+DOC_EXCERPT_LENGTHS = (1500, 800, 600)
+
+def _build_cache_entry(content, timestamp):
+    """Build a DOCS_CACHE entry holding the full doc plus pre-cut excerpts."""
+    entry = {"full": content, "timestamp": timestamp}
+    for length in DOC_EXCERPT_LENGTHS:
+        entry[f"head_{length}"] = content[:length]
+    return entry
 
-def fetch_documentation(doc_key):
-    """Fetch documentation from GitHub with caching."""
+# Shared HTTP/2 client for documentation fetches (lazy-initialized per event
+# loop). One TLS handshake to raw.githubusercontent.com is amortized across
+# all guide fetches, which multiplex over the same connection. The holder is
+# cache_resource: bare globals reset every rerun, leaking one unclosed client
+# per interaction and pooling nothing.
+@st.cache_resource(show_spinner=False)
+def _http_client_state():
+    """Holder for the loop-bound httpx client, surviving reruns."""
+    return {"client": None, "loop": None}
+
+_HTTP_CLIENT_STATE = _http_client_state()
+
+async def _get_http_client():
+    """Return the shared httpx client, recreating it if the event loop changed."""
+    state = _HTTP_CLIENT_STATE
+    loop = asyncio.get_running_loop()
+    if state["client"] is None or state["client"].is_closed or state["loop"] is not loop:
+        state["client"] = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=8)
+        )
+        state["loop"] = loop
+    return state["client"]
+
+async def fetch_documentation(doc_key):
+    """Fetch documentation from GitHub with caching and ETag revalidation."""
     now = datetime.now().timestamp()
-    
+
     # Check cache first
-    if doc_key in DOCS_CACHE:
-        cache_entry = DOCS_CACHE[doc_key]
-        if now - cache_entry["timestamp"] < CACHE_EXPIRY:
-            log_system_message(f"DOCS: Using cached {doc_key}")
-            return cache_entry["content"]
-    
+    cache_entry = DOCS_CACHE.get(doc_key)
+    if cache_entry is not None and now - cache_entry["timestamp"] < CACHE_EXPIRY:
+        log_system_message(f"DOCS: Using cached {doc_key}")
+        return cache_entry["full"]
+
     # Fetch from GitHub
     url = DOCUMENTATION_URLS.get(doc_key)
     if not url:
         log_system_message(f"DOCS: Unknown documentation key: {doc_key}")
         return None
-    
+
+    # Revalidate expired entries instead of re-downloading: GitHub answers
+    # 304 Not Modified (zero body bytes) when the guide is unchanged
+    headers = {}
+    if cache_entry is not None and cache_entry.get("etag"):
+        headers["If-None-Match"] = cache_entry["etag"]
+
     try:
         log_system_message(f"DOCS: Fetching {doc_key} from GitHub")
-        response = requests.get(url, timeout=10)
+        http_client = await _get_http_client()
+        response = await http_client.get(url, headers=headers)
+
+        if response.status_code == 304:
+            log_system_message(f"DOCS: {doc_key} not modified, keeping cached copy")
+            cache_entry["timestamp"] = now
+            return cache_entry["full"]
+
         response.raise_for_status()
-        
         content = response.text
-        DOCS_CACHE[doc_key] = {
-            "content": content,
-            "timestamp": now
-        }
-        
+
+        DOCS_CACHE[doc_key] = _build_cache_entry(content, now)
+        DOCS_CACHE[doc_key]["etag"] = response.headers.get("ETag")
+
         log_system_message(f"DOCS: Successfully fetched {doc_key}")
         return content
-        
-    except requests.RequestException as e:
+
+    except httpx.HTTPError as e:
         log_system_message(f"DOCS ERROR: Failed to fetch {doc_key}: {str(e)}")
         return None
 
-def analyze_technical_writing_issues(text):
-    """Quick analysis for immediate feedback."""
+async def fetch_documentation_excerpt(doc_key, length):
+    """Return a pre-truncated excerpt of a guide, fetching it if needed."""
+    content = await fetch_documentation(doc_key)
+    if content is None:
+        return None
+    cache_entry = DOCS_CACHE.get(doc_key)
+    if cache_entry is not None and f"head_{length}" in cache_entry:
+        return cache_entry[f"head_{length}"]
+    return content[:length]
+
+async def prefetch_all_docs():
+    """Warm the documentation cache by fetching all guides concurrently."""
+    await asyncio.gather(*[fetch_documentation(key) for key in DOCUMENTATION_URLS])
+
+# Precompiled style-check patterns; compiled once instead of per keystroke
+PASSIVE_RE = re.compile(r'(?:should|can|will)\s+be\s+\w+ed', re.IGNORECASE)
+TOPIC_RE = re.compile(r'\b(?:(?P<style>style|format|voice|tense)|(?P<content>content|clarity|wordiness))\b', re.IGNORECASE)
+FUTURE_RE = re.compile(r'\bwill\s+\w+', re.IGNORECASE)
+FILLER_RE = re.compile(r'\b(actually|basically|really|very)\b', re.IGNORECASE)
+VAGUE_UI_RE = re.compile(r'\bthe\s+(button|link|field)\b', re.IGNORECASE)
+
+# Chat intent: one pass over the input instead of scanning per keyword
+_REWRITE_RE = re.compile(
+    r"rewrite|go ahead|yes,?\s*please|create new version|improve draft",
+    re.IGNORECASE,
+)
+
+def analyze_technical_writing_issues(text, max_issues=None):
+    """Quick analysis for immediate feedback.
+
+    When max_issues is set, scanning stops as soon as that many findings
+    exist — callers that only display a few results shouldn't pay for a
+    full pass over a long document.
+    """
     issues = []
-    
+
+    def _full():
+        return max_issues is not None and len(issues) >= max_issues
+
     # Passive voice detection
-    passive_patterns = [r'should be\s+\w+ed', r'can be\s+\w+ed', r'will be\s+\w+ed']
-    for pattern in passive_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            issues.append({
-                "type": "Passive Voice",
-                "priority": "High",
-                "suggestion": "Use active voice in instructions"
-            })
-    
+    if PASSIVE_RE.search(text):
+        issues.append({
+            "type": "Passive Voice",
+            "priority": "High",
+            "suggestion": "Use active voice in instructions"
+        })
+
     # Future tense detection
-    if re.search(r'\bwill\s+\w+', text, re.IGNORECASE):
+    if not _full() and FUTURE_RE.search(text):
         issues.append({
             "type": "Future Tense",
             "priority": "Medium",
             "suggestion": "Use present tense: 'returns' not 'will return'"
         })
-    
-    # Wordiness detection
-    filler_words = ["actually", "basically", "really", "very"]
-    for word in filler_words:
-        if re.search(rf'\b{word}\b', text, re.IGNORECASE):
-            issues.append({
-                "type": "Wordiness",
-                "priority": "High", 
-                "suggestion": f"Remove unnecessary '{word}'"
-            })
-    
+
+    # Wordiness detection - one pass over the text for all filler words
+    if not _full():
+        seen_fillers = []
+        for match in FILLER_RE.finditer(text):
+            word = match.group(1).lower()
+            if word not in seen_fillers:
+                seen_fillers.append(word)
+                issues.append({
+                    "type": "Wordiness",
+                    "priority": "High",
+                    "suggestion": f"Remove unnecessary '{word}'"
+                })
+                if _full():
+                    break
+
     # Vague UI references
-    if re.search(r'\bthe button\b|\bthe link\b|\bthe field\b', text, re.IGNORECASE):
+    if not _full() and VAGUE_UI_RE.search(text):
         issues.append({
             "type": "Vague UI Reference",
             "priority": "High",
             "suggestion": "Specify UI elements: 'the Save button' not 'the button'"
         })
-    
+
     return issues
 
 # ============================================================================
-# MULTI-AGENT FUNCTIONS
+# AGENT COMPLETION HELPERS
 # ============================================================================
 
-async def run_content_analysis(document_text, doc_metadata):
-    """Content Analyzer Agent - analyzes content quality issues."""
-    log_system_message("Content Analyzer: Starting analysis")
-    
-    content_guide = fetch_documentation("content_classification_guide")
-    
-    system_prompt = f"""
+class SemanticCache:
+    """Embedding-based response cache with a cosine-similarity threshold.
+
+    Entries are bucketed per (agent, SHA-256 of system prompt) so a response
+    is only reused when the agent role and instructions match exactly and the
+    user prompt is near-identical. Embeddings are far cheaper than a GPT-4
+    completion, so a hit skips the completion entirely.
+    """
+
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, expiry=CACHE_EXPIRY):
+        self.threshold = threshold
+        self.expiry = expiry
+        self._entries = {}  # bucket key -> list of (embedding, response, timestamp)
+        self._synced = set()  # buckets already reloaded from Redis
+
+    @staticmethod
+    def _bucket_key(agent_name, system_prompt):
+        prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+        return f"{agent_name}:{prompt_hash}"
+
+    async def _embed(self, text):
+        response = await client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+        embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
+        return embedding / np.linalg.norm(embedding)
+
+    async def lookup(self, agent_name, system_prompt, user_prompt):
+        """Return (cached_response, embedding); response is None on a miss."""
+        embedding = await self._embed(user_prompt)
+        now = datetime.now().timestamp()
+
+        bucket = self._bucket_key(agent_name, system_prompt)
+        # First sight of a bucket this process: pull any entries a
+        # previous run persisted to Redis before searching
+        if bucket not in self._synced:
+            self._synced.add(bucket)
+            self._entries.setdefault(bucket, []).extend(await _redis_load_semantic(bucket))
+        entries = [e for e in self._entries.get(bucket, []) if now - e[2] < self.expiry]
+        self._entries[bucket] = entries
+
+        if entries:
+            cache_matrix = np.stack([e[0] for e in entries])
+            similarities = cache_matrix @ embedding  # normalized vectors -> cosine
+            best = int(np.argmax(similarities))
+            if similarities[best] > self.threshold:
+                return entries[best][1], embedding
+
+        return None, embedding
+
+    def store(self, agent_name, system_prompt, embedding, response):
+        bucket = self._bucket_key(agent_name, system_prompt)
+        timestamp = datetime.now().timestamp()
+        self._entries.setdefault(bucket, []).append((embedding, response, timestamp))
+
+@st.cache_resource(show_spinner=False)
+def _semantic_cache():
+    """The process-wide semantic cache; a module global would be rebuilt
+    empty on every rerun and could never hit across clicks."""
+    return SemanticCache()
+
+SEMANTIC_CACHE = _semantic_cache()
+
+# Exact-match completion cache. The low-temperature agents are near
+# deterministic, so identical request payloads never need to re-hit the API.
+AGENT_CACHE_TTL = 3600
+
+@st.cache_resource(show_spinner=False)
+def _agent_cache():
+    """Exact-match store, held across reruns for the same reason."""
+    return {}  # key -> (response, timestamp)
+
+_AGENT_CACHE = _agent_cache()
+
+def _completion_cache_key(messages, params):
+    """Stable SHA-256 key over the full request payload."""
+    payload = json.dumps({"messages": messages, **params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+_REDIS_CLIENT = None
+
+def _get_redis():
+    """Return the shared Redis client, or None when Redis is not configured."""
+    global _REDIS_CLIENT
+    if _REDIS_CLIENT is None and redis_async is not None and REDIS_URL:
+        _REDIS_CLIENT = redis_async.Redis.from_url(REDIS_URL)
+    return _REDIS_CLIENT
+
+async def _redis_cache_get(cache_key):
+    """Look up a completion in Redis; fall back silently on any failure."""
+    redis_client = _get_redis()
+    if redis_client is None:
+        return None
+    try:
+        entry = await redis_client.hgetall(f"cache:{cache_key}")
+        if entry:
+            await redis_client.hincrby(f"cache:{cache_key}", "hits", 1)
+            return entry[b"response"].decode("utf-8")
+    except Exception as e:
+        log_system_message(f"CACHE: Redis lookup failed - {str(e)}")
+    return None
+
+async def _redis_cache_put(cache_key, user_prompt, response, embedding=None, bucket=None):
+    """Persist a completion to Redis so hits survive reruns and deploys.
+
+    When an embedding and its semantic bucket are given, the key is also
+    indexed under semantic:{bucket} so _redis_load_semantic can rebuild
+    the semantic cache in a fresh process.
+    """
+    redis_client = _get_redis()
+    if redis_client is None:
+        return
+    try:
+        mapping = {
+            "prompt": user_prompt,
+            "response": response,
+            "ts": datetime.now().timestamp(),
+            "hits": 0
+        }
+        if embedding is not None:
+            mapping["embedding"] = embedding.astype(np.float32).tobytes()
+        await redis_client.hset(f"cache:{cache_key}", mapping=mapping)
+        await redis_client.expire(f"cache:{cache_key}", AGENT_CACHE_TTL)
+        if embedding is not None and bucket is not None:
+            await redis_client.rpush(f"semantic:{bucket}", cache_key)
+            await redis_client.expire(f"semantic:{bucket}", AGENT_CACHE_TTL)
+    except Exception as e:
+        log_system_message(f"CACHE: Redis store failed - {str(e)}")
+
+async def _redis_load_semantic(bucket):
+    """Reload persisted (embedding, response, ts) entries for one bucket."""
+    redis_client = _get_redis()
+    if redis_client is None:
+        return []
+    entries = []
+    try:
+        cache_keys = await redis_client.lrange(f"semantic:{bucket}", 0, -1)
+        for cache_key in cache_keys:
+            entry = await redis_client.hgetall(f"cache:{cache_key.decode('utf-8')}")
+            if entry and b"embedding" in entry:
+                embedding = np.frombuffer(entry[b"embedding"], dtype=np.float32)
+                entries.append((embedding, entry[b"response"].decode("utf-8"), float(entry[b"ts"])))
+    except Exception as e:
+        log_system_message(f"CACHE: Redis semantic reload failed - {str(e)}")
+    return entries
+
+# Concurrency limiter (lazy-initialized per event loop, like the HTTP session)
+_LLM_SEMAPHORE = None
+_LLM_SEMAPHORE_LOOP = None
+
+def _get_llm_semaphore():
+    """Return the completion-call semaphore for the running event loop."""
+    global _LLM_SEMAPHORE, _LLM_SEMAPHORE_LOOP
+    loop = asyncio.get_running_loop()
+    if _LLM_SEMAPHORE is None or _LLM_SEMAPHORE_LOOP is not loop:
+        _LLM_SEMAPHORE = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        _LLM_SEMAPHORE_LOOP = loop
+    return _LLM_SEMAPHORE
+
+@retry(retry=retry_if_exception_type(RateLimitError),
+       wait=wait_exponential(multiplier=1, max=30),
+       stop=stop_after_attempt(5),
+       reraise=True)
+async def _create_completion(**kwargs):
+    """Issue a completion call under the global concurrency cap, with backoff on 429s."""
+    async with _get_llm_semaphore():
+        return await client.chat.completions.create(**kwargs)
+
+async def run_agent_completion(agent_name, system_prompt, user_prompt, **params):
+    """Run an agent's chat completion, serving repeated prompts from cache."""
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+    # Exact-match lookup first: an O(1) dict read beats even the embedding call
+    cache_key = _completion_cache_key(messages, params)
+    cache_entry = _AGENT_CACHE.get(cache_key)
+    if cache_entry and datetime.now().timestamp() - cache_entry[1] < AGENT_CACHE_TTL:
+        log_system_message(f"CACHE: Exact hit for {agent_name}")
+        return cache_entry[0]
+
+    # Shared Redis cache survives Streamlit reruns and multi-worker deploys
+    redis_hit = await _redis_cache_get(cache_key)
+    if redis_hit is not None:
+        log_system_message(f"CACHE: Redis hit for {agent_name}")
+        _AGENT_CACHE[cache_key] = (redis_hit, datetime.now().timestamp())
+        return redis_hit
+
+    cached, embedding = None, None
+    try:
+        cached, embedding = await SEMANTIC_CACHE.lookup(agent_name, system_prompt, user_prompt)
+    except Exception as e:
+        log_system_message(f"CACHE: Embedding lookup failed - {str(e)}")
+
+    if cached is not None:
+        log_system_message(f"CACHE: Semantic hit for {agent_name}")
+        _AGENT_CACHE[cache_key] = (cached, datetime.now().timestamp())
+        return cached
+
+    log_system_message(f"CACHE: Miss for {agent_name}")
+    response = await _create_completion(messages=messages, **params)
+    content = response.choices[0].message.content
+
+    _AGENT_CACHE[cache_key] = (content, datetime.now().timestamp())
+    if embedding is not None:
+        SEMANTIC_CACHE.store(agent_name, system_prompt, embedding, content)
+    await _redis_cache_put(cache_key, user_prompt, content, embedding,
+                           bucket=SemanticCache._bucket_key(agent_name, system_prompt))
+
+    return content
+
+async def stream_agent_completion(agent_name, system_prompt, user_prompt, **params):
+    """Stream an agent's completion token-by-token, filling caches at the end.
+
+    Cache hits are yielded as a single chunk; misses stream from the API so
+    the first tokens arrive in ~500ms instead of after the full generation.
+    """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+    cache_key = _completion_cache_key(messages, params)
+    cache_entry = _AGENT_CACHE.get(cache_key)
+    if cache_entry and datetime.now().timestamp() - cache_entry[1] < AGENT_CACHE_TTL:
+        log_system_message(f"CACHE: Exact hit for {agent_name}")
+        yield cache_entry[0]
+        return
+
+    cached, embedding = None, None
+    try:
+        cached, embedding = await SEMANTIC_CACHE.lookup(agent_name, system_prompt, user_prompt)
+    except Exception as e:
+        log_system_message(f"CACHE: Embedding lookup failed - {str(e)}")
+
+    if cached is not None:
+        log_system_message(f"CACHE: Semantic hit for {agent_name}")
+        _AGENT_CACHE[cache_key] = (cached, datetime.now().timestamp())
+        yield cached
+        return
+
+    log_system_message(f"CACHE: Miss for {agent_name}")
+    stream = await _create_completion(messages=messages, stream=True, **params)
+    parts = []
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            yield delta
+
+    content = "".join(parts)
+    _AGENT_CACHE[cache_key] = (content, datetime.now().timestamp())
+    if embedding is not None:
+        SEMANTIC_CACHE.store(agent_name, system_prompt, embedding, content)
+    await _redis_cache_put(cache_key, user_prompt, content, embedding,
+                           bucket=SemanticCache._bucket_key(agent_name, system_prompt))
+
+async def _collect_stream(chunks):
+    """Accumulate a streamed completion into the full response text."""
+    return "".join([chunk async for chunk in chunks])
+
+@st.cache_resource(show_spinner=False)
+def get_event_loop():
+    """Event loop on a background thread, shared across reruns.
+
+    Running every coroutine on one long-lived loop keeps the HTTP client,
+    semaphore and writer task alive between clicks, so the connection pool
+    to OpenAI survives instead of being torn down with each asyncio.run.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True, name="agent-loop").start()
+    return loop
+
+def run_async(coro):
+    """Run a coroutine on the persistent loop and block for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+def _iter_stream_sync(async_gen):
+    """Bridge an async generator into a sync one for st.write_stream."""
+    loop = get_event_loop()
+    while True:
+        try:
+            yield asyncio.run_coroutine_threadsafe(async_gen.__anext__(), loop).result()
+        except StopAsyncIteration:
+            break
+
+# System prompts only change when a guide's cached excerpt rotates (hourly),
+# so memoize them on the excerpt text instead of re-formatting per call. This
+# also keeps the exact-match completion cache key stable between calls.
+@functools.lru_cache(maxsize=8)
+def _build_content_system_prompt(guide_excerpt):
+    """Build the Content Analyzer system prompt for a given guide excerpt."""
+    return f"""
     You are a Content Analyzer Agent specializing in technical documentation quality.
 
     Focus on identifying:
@@ -154,10 +570,82 @@ async def run_content_analysis(document_text, doc_metadata):
     6. Missing outcomes and value statements
 
     Content Guide Reference:
-    {content_guide[:1500] if content_guide else "Guide not available"}
+    {guide_excerpt if guide_excerpt else "Guide not available"}
 
     Provide specific examples and actionable suggestions.
     """
+
+@functools.lru_cache(maxsize=8)
+def _build_style_system_prompt(guide_excerpt):
+    """Build the Style Guide Enforcer system prompt for a given guide excerpt."""
+    return f"""
+    You are a Style Guide Enforcer Agent specializing in technical writing standards.
+
+    Check for:
+    1. Active vs passive voice
+    2. Present tense usage
+    3. Sentence length (max 26 words)
+    4. UI element specifications
+    5. Capitalization and formatting
+    6. Grammar and punctuation
+
+    Style Guide Reference:
+    {guide_excerpt if guide_excerpt else "Guide not available"}
+
+    Identify specific violations with corrections.
+    """
+
+@functools.lru_cache(maxsize=8)
+def _build_rewrite_system_prompt(style_excerpt, content_excerpt):
+    """Build the Technical Writer system prompt for the given guide excerpts."""
+    return f"""
+    You are a Technical Writer Agent specializing in document improvement.
+
+    Rewriting principles:
+    1. Apply all style guide standards
+    2. Fix content quality issues  
+    3. Maintain technical accuracy
+    4. Preserve author intent
+    5. Ensure logical flow
+    6. Optimize for user experience
+
+    Style Guide:
+    {style_excerpt if style_excerpt else ""}
+    
+    Content Rules:
+    {content_excerpt if content_excerpt else ""}
+    
+    Create a polished, professional version.
+    """
+
+@functools.lru_cache(maxsize=32)
+def _build_chat_system_prompt(reference_material):
+    """Build the Chat Assistant system prompt for the given reference material."""
+    return f"""
+    You are a Chat Assistant Agent for technical writers.
+
+    Expertise:
+    1. Technical writing principles
+    2. Style guide standards
+    3. Content improvement techniques
+    4. Documentation processes
+
+    Reference Material:
+    {reference_material if reference_material else "Using general technical writing knowledge"}
+    
+    Provide helpful, specific guidance.
+    """
+
+# ============================================================================
+# MULTI-AGENT FUNCTIONS
+# ============================================================================
+
+async def run_content_analysis(document_text, doc_metadata):
+    """Content Analyzer Agent - analyzes content quality issues."""
+    log_system_message("Content Analyzer: Starting analysis")
+    
+    content_guide = await fetch_documentation_excerpt("content_classification_guide", 1500)
+    system_prompt = _build_content_system_prompt(content_guide)
     
     user_prompt = f"""
     Analyze this {doc_metadata.get('type', 'document')} for content quality issues:
@@ -171,17 +659,10 @@ async def run_content_analysis(document_text, doc_metadata):
     """
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=1000,
-            temperature=0.2
+        analysis = await run_agent_completion(
+            "Content Analyzer", system_prompt, user_prompt,
+            model="gpt-4", max_tokens=1000, temperature=0.2
         )
-        
-        analysis = response.choices[0].message.content
         log_system_message("Content Analyzer: Analysis completed")
         return {
             "agent": "Content Analyzer",
@@ -196,24 +677,8 @@ async def run_style_analysis(document_text, doc_metadata):
     """Style Guide Agent - checks style compliance."""
     log_system_message("Style Guide Enforcer: Starting compliance check")
     
-    style_guide = fetch_documentation("style_guide")
-    
-    system_prompt = f"""
-    You are a Style Guide Enforcer Agent specializing in technical writing standards.
-
-    Check for:
-    1. Active vs passive voice
-    2. Present tense usage
-    3. Sentence length (max 26 words)
-    4. UI element specifications
-    5. Capitalization and formatting
-    6. Grammar and punctuation
-
-    Style Guide Reference:
-    {style_guide[:1500] if style_guide else "Guide not available"}
-
-    Identify specific violations with corrections.
-    """
+    style_guide = await fetch_documentation_excerpt("style_guide", 1500)
+    system_prompt = _build_style_system_prompt(style_guide)
     
     user_prompt = f"""
     Check this {doc_metadata.get('type', 'document')} for style guide compliance:
@@ -227,17 +692,10 @@ async def run_style_analysis(document_text, doc_metadata):
     """
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=1000,
-            temperature=0.1
+        compliance_check = await run_agent_completion(
+            "Style Guide Enforcer", system_prompt, user_prompt,
+            model="gpt-4", max_tokens=1000, temperature=0.1
         )
-        
-        compliance_check = response.choices[0].message.content
         log_system_message("Style Guide Enforcer: Check completed")
         return {
             "agent": "Style Guide Enforcer",
@@ -293,17 +751,10 @@ async def run_editorial_synthesis(document_text, doc_metadata, agent_reports):
     """
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=1500,
-            temperature=0.3
-        )
-        
-        editorial_review = response.choices[0].message.content
+        editorial_review = await _collect_stream(stream_agent_completion(
+            "Senior Editor", system_prompt, user_prompt,
+            model="gpt-4", max_tokens=1500, temperature=0.3
+        ))
         log_system_message("Senior Editor: Review completed")
         return {
             "agent": "Senior Editor",
@@ -315,32 +766,13 @@ async def run_editorial_synthesis(document_text, doc_metadata, agent_reports):
         log_system_message(f"Senior Editor: Error - {str(e)}")
         return {"agent": "Senior Editor", "error": str(e)}
 
-async def run_document_rewrite(original_text, doc_metadata, editorial_guidance):
-    """Technical Writer Agent - rewrites document with improvements."""
+async def run_document_rewrite_stream(original_text, doc_metadata, editorial_guidance):
+    """Technical Writer Agent - streams the rewritten document chunk by chunk."""
     log_system_message("Technical Writer: Starting rewrite")
     
-    style_guide = fetch_documentation("style_guide")
-    content_guide = fetch_documentation("content_classification_guide")
-    
-    system_prompt = f"""
-    You are a Technical Writer Agent specializing in document improvement.
-
-    Rewriting principles:
-    1. Apply all style guide standards
-    2. Fix content quality issues  
-    3. Maintain technical accuracy
-    4. Preserve author intent
-    5. Ensure logical flow
-    6. Optimize for user experience
-
-    Style Guide:
-    {style_guide[:800] if style_guide else ""}
-    
-    Content Rules:
-    {content_guide[:800] if content_guide else ""}
-    
-    Create a polished, professional version.
-    """
+    style_guide = await fetch_documentation_excerpt("style_guide", 800)
+    content_guide = await fetch_documentation_excerpt("content_classification_guide", 800)
+    system_prompt = _build_rewrite_system_prompt(style_guide, content_guide)
     
     user_prompt = f"""
     Rewrite this document incorporating editorial feedback:
@@ -356,59 +788,29 @@ async def run_document_rewrite(original_text, doc_metadata, editorial_guidance):
     Provide complete improved version addressing all issues.
     """
     
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=2500,
-            temperature=0.2
-        )
-        
-        rewritten_draft = response.choices[0].message.content
-        log_system_message("Technical Writer: Rewrite completed")
-        return {
-            "agent": "Technical Writer",
-            "improved_draft": rewritten_draft
-        }
-        
-    except Exception as e:
-        log_system_message(f"Technical Writer: Error - {str(e)}")
-        return {"agent": "Technical Writer", "error": str(e)}
+    async for chunk in stream_agent_completion(
+        "Technical Writer", system_prompt, user_prompt,
+        model="gpt-4", max_tokens=2500, temperature=0.2
+    ):
+        yield chunk
+    log_system_message("Technical Writer: Rewrite completed")
 
 async def handle_chat_question(user_question, context=None):
     """Chat Assistant Agent - handles user questions."""
     log_system_message("Chat Assistant: Answering question")
     
-    # Fetch relevant docs based on question
-    docs_to_fetch = []
-    if any(word in user_question.lower() for word in ["style", "format", "voice", "tense"]):
-        docs_to_fetch.append("style_guide")
-    if any(word in user_question.lower() for word in ["content", "clarity", "wordiness"]):
-        docs_to_fetch.append("content_classification_guide")
+    # Fetch relevant docs based on question - one scan for all topic keywords
+    topic_docs = {"style": "style_guide", "content": "content_classification_guide"}
+    topics = {match.lastgroup for match in TOPIC_RE.finditer(user_question)}
+    docs_to_fetch = [topic_docs[topic] for topic in ("style", "content") if topic in topics]
     
     reference_material = ""
     for doc_key in docs_to_fetch:
-        content = fetch_documentation(doc_key)
+        content = await fetch_documentation_excerpt(doc_key, 600)
         if content:
-            reference_material += f"{doc_key}: {content[:600]}\n\n"
-    
-    system_prompt = f"""
-    You are a Chat Assistant Agent for technical writers.
-
-    Expertise:
-    1. Technical writing principles
-    2. Style guide standards
-    3. Content improvement techniques
-    4. Documentation processes
-
-    Reference Material:
-    {reference_material if reference_material else "Using general technical writing knowledge"}
+            reference_material += f"{doc_key}: {content}\n\n"
     
-    Provide helpful, specific guidance.
-    """
+    system_prompt = _build_chat_system_prompt(reference_material)
     
     user_prompt = f"""
     User Question: {user_question}
@@ -419,17 +821,10 @@ async def handle_chat_question(user_question, context=None):
     """
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=800,
-            temperature=0.3
-        )
-        
-        guidance = response.choices[0].message.content
+        guidance = await _collect_stream(stream_agent_completion(
+            "Chat Assistant", system_prompt, user_prompt,
+            model="gpt-4", max_tokens=800, temperature=0.3
+        ))
         log_system_message("Chat Assistant: Response provided")
         return {
             "agent": "Chat Assistant",
@@ -460,13 +855,21 @@ async def run_multi_agent_review(document_text, doc_metadata):
         editorial_result = await run_editorial_synthesis(document_text, doc_metadata, agent_reports)
         
         log_system_message("Orchestrator: Multi-agent review completed")
-        
-        # Store for potential rewrite
+
+        # Session-state writes happen in main() on the script thread —
+        # from this loop they'd land in a context-less mock and vanish
         if "review" in editorial_result:
-            st.session_state['last_review'] = editorial_result["review"]
-            st.session_state['last_document'] = document_text
-            st.session_state['agent_reports'] = agent_reports
-        
+            # Persist through the batched writer; the loop and writer
+            # task outlive this run, so the write completes out of band
+            # instead of holding up the response
+            await queue_editorial_review(
+                doc_metadata.get('type', 'Unknown'),
+                doc_metadata.get('title', 'Untitled'),
+                doc_metadata.get('author', 'User'),
+                document_text,
+                review_notes=editorial_result["review"]
+            )
+
         return editorial_result
         
     except Exception as e:
@@ -477,11 +880,35 @@ async def run_multi_agent_review(document_text, doc_metadata):
 # DATABASE FUNCTIONS
 # ============================================================================
 
+# Single long-lived connection. WAL mode lets readers run alongside the
+# writer, and skipping per-call open/close avoids repeated setup and fsyncs.
+# Held via cache_resource: a bare global would be reset (and the previous
+# connection leaked) on every rerun.
+@st.cache_resource(show_spinner=False)
+def get_db_connection():
+    """Return the shared SQLite connection, created once per process."""
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+@st.cache_resource(show_spinner=False)
+def _db_write_lock():
+    """One write lock per process; a per-rerun lock would let writers
+    from different script generations interleave."""
+    return threading.Lock()
+
+_DB_WRITE_LOCK = _db_write_lock()
+
 def init_database():
     """Initialize SQLite database for editorial reviews."""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = get_db_connection()
         cursor = conn.cursor()
+        # Hot listing rows stay lean; the multi-KB document and review text
+        # live in a side table joined only when a single review is opened
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS editorial_reviews (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -489,91 +916,189 @@ def init_database():
             document_type TEXT NOT NULL,
             document_title TEXT,
             author TEXT,
-            original_text TEXT NOT NULL,
-            review_notes TEXT,
             issues_found TEXT,
             readability_score TEXT,
             review_status TEXT DEFAULT 'in_progress',
             reviewer_feedback TEXT
         )
         ''')
-        conn.commit()
-        conn.close()
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS editorial_review_bodies (
+            id INTEGER PRIMARY KEY,
+            original_text TEXT NOT NULL,
+            review_notes TEXT
+        )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reviews_ts ON editorial_reviews(timestamp)")
         st.sidebar.success(f"✅ Connected to editorial database: {DB_FILE}")
         return True
     except Exception as e:
         st.sidebar.error(f"❌ Failed to initialize database: {e}")
         return False
 
+@st.cache_resource(show_spinner=False)
+def ensure_schema():
+    """Run init_database once per process; reruns just read the cached flag."""
+    return init_database()
+
 def save_editorial_review(doc_type, doc_title, author, original_text, review_notes=None, issues=None, readability=None, status="in_progress"):
     """Save editorial review to database."""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
+    lean_row = (timestamp, doc_type, doc_title, author,
+                json.dumps(issues) if issues else "", json.dumps(readability) if readability else "", status)
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute('''
-        INSERT INTO editorial_reviews (timestamp, document_type, document_title, author, original_text, review_notes, issues_found, readability_score, review_status)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (timestamp, doc_type, doc_title, author, original_text, review_notes or "", 
-              json.dumps(issues) if issues else "", json.dumps(readability) if readability else "", status))
-        conn.commit()
-        conn.close()
+        conn = get_db_connection()
+        with _DB_WRITE_LOCK:
+            conn.execute("BEGIN")
+            try:
+                _insert_review_row(conn, lean_row, original_text, review_notes or "")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
         return True
     except Exception as e:
         log_system_message(f"Database error: {str(e)}")
         return False
 
-def get_editorial_reviews():
-    """Retrieve all editorial reviews from database."""
+# Write-behind queue: concurrent review saves coalesce into one transaction
+# (one fsync) instead of a commit per row.
+WRITE_BATCH_SIZE = 32
+WRITE_BATCH_WAIT = 0.05  # seconds to wait for more rows before flushing
+
+_INSERT_REVIEW_SQL = '''
+INSERT INTO editorial_reviews (timestamp, document_type, document_title, author, issues_found, readability_score, review_status)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+_INSERT_BODY_SQL = '''
+INSERT INTO editorial_review_bodies (id, original_text, review_notes)
+VALUES (?, ?, ?)
+'''
+
+def _insert_review_row(conn, lean_row, original_text, review_notes):
+    """Insert the lean review row and its paired body row."""
+    cursor = conn.execute(_INSERT_REVIEW_SQL, lean_row)
+    conn.execute(_INSERT_BODY_SQL, (cursor.lastrowid, original_text, review_notes))
+
+async def _db_writer(write_queue):
+    """Drain queued review rows and insert them in batches."""
+    conn = get_db_connection()
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await write_queue.get()]
+        deadline = loop.time() + WRITE_BATCH_WAIT
+        while len(batch) < WRITE_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(write_queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        try:
+            with _DB_WRITE_LOCK:
+                conn.execute("BEGIN")
+                try:
+                    for lean_row, original_text, review_notes in batch:
+                        _insert_review_row(conn, lean_row, original_text, review_notes)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+        except Exception as e:
+            log_system_message(f"Database error: {str(e)}")
+        finally:
+            for _ in batch:
+                write_queue.task_done()
+
+@st.cache_resource(show_spinner=False)
+def _write_queue():
+    """The review write queue, created together with its writer task.
+
+    Both live in one cache_resource factory on the persistent loop, so
+    every rerun feeds the same queue one long-lived writer drains —
+    rebuilding either per rerun leaked orphaned tasks blocked forever on
+    queues nothing enqueued into.
+    """
+    write_queue = asyncio.Queue(maxsize=64)
+
+    async def _start():
+        asyncio.get_running_loop().create_task(_db_writer(write_queue))
+
+    asyncio.run_coroutine_threadsafe(_start(), get_event_loop()).result()
+    return write_queue
+
+WRITE_QUEUE = _write_queue()
+
+async def queue_editorial_review(doc_type, doc_title, author, original_text, review_notes=None, issues=None, readability=None, status="in_progress"):
+    """Queue an editorial review row for the batched background writer.
+
+    If the bounded queue is full the row is written synchronously
+    instead — a slow save beats silently backing up the writer.
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    lean_row = (timestamp, doc_type, doc_title, author,
+                json.dumps(issues) if issues else "", json.dumps(readability) if readability else "", status)
     try:
-        conn = sqlite3.connect(DB_FILE)
-        df = pd.read_sql_query("SELECT * FROM editorial_reviews ORDER BY timestamp DESC", conn)
-        conn.close()
-        return df
+        WRITE_QUEUE.put_nowait((lean_row, original_text, review_notes or ""))
+    except asyncio.QueueFull:
+        save_editorial_review(doc_type, doc_title, author, original_text,
+                              review_notes=review_notes, issues=issues,
+                              readability=readability, status=status)
+
+def get_recent_reviews(n=5):
+    """Fetch just the newest reviews with the columns the sidebar shows.
+
+    Returns plain dict rows — st.dataframe renders them directly, so the
+    handful of sidebar rows never pays DataFrame construction.
+    """
+    try:
+        conn = get_db_connection()
+        rows = conn.execute(
+            "SELECT timestamp, document_title, document_type FROM editorial_reviews "
+            "ORDER BY timestamp DESC LIMIT ?", (n,)
+        ).fetchall()
+        return [dict(row) for row in rows]
     except Exception as e:
         log_system_message(f"Database error: {str(e)}")
-        return pd.DataFrame()
+        return []
+
+def count_editorial_reviews():
+    """Total number of stored reviews."""
+    try:
+        conn = get_db_connection()
+        return conn.execute("SELECT COUNT(*) FROM editorial_reviews").fetchone()[0]
+    except Exception as e:
+        log_system_message(f"Database error: {str(e)}")
+        return 0
+
+def get_review_detail(review_id):
+    """Fetch the full text and notes for a single review on demand."""
+    try:
+        conn = get_db_connection()
+        row = conn.execute(
+            "SELECT r.id, r.timestamp, r.document_type, r.document_title, r.author, "
+            "r.issues_found, r.readability_score, r.review_status, r.reviewer_feedback, "
+            "b.original_text, b.review_notes "
+            "FROM editorial_reviews r "
+            "LEFT JOIN editorial_review_bodies b ON b.id = r.id "
+            "WHERE r.id = ?", (review_id,)
+        ).fetchone()
+        return dict(row) if row else None
+    except Exception as e:
+        log_system_message(f"Database error: {str(e)}")
+        return None
 
 # ============================================================================
 # STREAMLIT UI
 # ============================================================================
 
-def render_sidebar():
-    """Render clean side navigation with organized dropdowns."""
-    st.sidebar.title("📚 Tech 101 Assistant")
-    
-    # System Status
-    with st.sidebar.expander("⚙️ System Status", expanded=True):
-        if OPENAI_API_KEY:
-            st.success("✅ System Ready")
-        else:
-            st.error("❌ Setup Required")
-            st.info("Add OpenAI API key to .env file")
-            return
-    
-    # Document Actions
-    with st.sidebar.expander("📝 Document Actions", expanded=False):
-        if st.button("🔄 New Session", use_container_width=True):
-            # Clear session state
-            for key in ['messages', 'document_metadata', 'last_review', 'last_document', 'agent_reports']:
-                if key in st.session_state:
-                    del st.session_state[key]
-            st.rerun()
-        
-        if st.button("📊 View History", use_container_width=True):
-            df = get_editorial_reviews()
-            if not df.empty:
-                st.write(f"📝 {len(df)} reviews completed")
-                # Show recent reviews
-                recent_reviews = df.head(5)[['timestamp', 'document_title', 'document_type']]
-                st.dataframe(recent_reviews, use_container_width=True)
-            else:
-                st.info("No reviews yet")
-    
-    # Writing Guidelines
-    with st.sidebar.expander("📋 Writing Guidelines", expanded=False):
-        st.markdown("""
+# Static sidebar copy and page CSS, hoisted so reruns reuse one string
+# object instead of rebuilding each block.
+_WRITING_GUIDELINES_MD = """
         **Essential Rules:**
         - Use active voice, not passive
         - Write in present tense  
@@ -586,11 +1111,9 @@ def render_sidebar():
         - Use "Click **Save**" not "click the button"
         - "The API returns" not "will return"
         - "Configure settings" not "Settings should be configured"
-        """)
-    
-    # Document Types Guide
-    with st.sidebar.expander("📖 Document Types", expanded=False):
-        st.markdown("""
+        """
+
+_DOCUMENT_TYPES_MD = """
         **API Documentation:**
         - Clear endpoints and parameters
         - Code examples with responses
@@ -610,11 +1133,9 @@ def render_sidebar():
         - System requirements
         - Detailed setup steps
         - Verification procedures
-        """)
-    
-    # Quality Checklist
-    with st.sidebar.expander("✅ Quality Checklist", expanded=False):
-        st.markdown("""
+        """
+
+_QUALITY_CHECKLIST_MD = """
         **Before Review:**
         - [ ] Document title provided
         - [ ] Content is complete draft
@@ -626,11 +1147,9 @@ def render_sidebar():
         - [ ] Applied style guide rules
         - [ ] Tested procedures
         - [ ] Updated formatting
-        """)
-    
-    # Help & Support
-    with st.sidebar.expander("❓ Help & Support", expanded=False):
-        st.markdown("""
+        """
+
+_HELP_SUPPORT_MD = """
         **How to Use:**
         1. Enter document title and type
         2. Paste your content
@@ -642,41 +1161,9 @@ def render_sidebar():
         - Use the chat for specific questions
         - Check writing guidelines above
         - Review quality checklist
-        """)
-    
-    # System Tools
-    with st.sidebar.expander("🔧 System Tools", expanded=False):
-        if st.button("🧹 Clear Cache", use_container_width=True):
-            DOCS_CACHE.clear()
-            st.success("Documentation cache cleared")
-            log_system_message("SYSTEM: Documentation cache cleared")
-        
-        if st.button("📤 Export Reviews", use_container_width=True):
-            df = get_editorial_reviews()
-            if not df.empty:
-                json_data = df.to_json(orient="records", indent=4)
-                st.download_button(
-                    label="📋 Download Reviews",
-                    data=json_data,
-                    file_name="editorial_reviews_export.json",
-                    mime="application/json",
-                    use_container_width=True
-                )
-            else:
-                st.info("No reviews to export")
+        """
 
-def main():
-    """Main Streamlit application for Tech 101 Assistant."""
-    # Page configuration
-    st.set_page_config(
-        page_title="Tech 101 Assistant",
-        page_icon="📚",
-        layout="wide",
-        initial_sidebar_state="expanded"
-    )
-    
-    # Custom CSS for styling
-    st.markdown("""
+_PAGE_CSS = """
     <style>
     .stApp {
         background-color: #22577a;
@@ -728,7 +1215,134 @@ def main():
         color: #22577a;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+def render_sidebar():
+    """Render clean side navigation with organized dropdowns."""
+    st.sidebar.title("📚 Tech 101 Assistant")
+    
+    # System Status
+    with st.sidebar.expander("⚙️ System Status", expanded=True):
+        if OPENAI_API_KEY:
+            st.success("✅ System Ready")
+        else:
+            st.error("❌ Setup Required")
+            st.info("Add OpenAI API key to .env file")
+            return
+    
+    # Document Actions
+    with st.sidebar.expander("📝 Document Actions", expanded=False):
+        if st.button("🔄 New Session", use_container_width=True):
+            # Clear session state
+            for key in ['messages', 'document_metadata', 'last_review', 'last_document', 'agent_reports']:
+                if key in st.session_state:
+                    del st.session_state[key]
+            st.rerun()
+        
+        if st.button("📊 View History", use_container_width=True):
+            total_reviews = count_editorial_reviews()
+            if total_reviews:
+                st.write(f"📝 {total_reviews} reviews completed")
+                # Show recent reviews
+                st.dataframe(get_recent_reviews(5), use_container_width=True)
+            else:
+                st.info("No reviews yet")
+    
+    # Writing Guidelines
+    with st.sidebar.expander("📋 Writing Guidelines", expanded=False):
+        st.markdown(_WRITING_GUIDELINES_MD)
+    
+    # Document Types Guide
+    with st.sidebar.expander("📖 Document Types", expanded=False):
+        st.markdown(_DOCUMENT_TYPES_MD)
+    
+    # Quality Checklist
+    with st.sidebar.expander("✅ Quality Checklist", expanded=False):
+        st.markdown(_QUALITY_CHECKLIST_MD)
+    
+    # Help & Support
+    with st.sidebar.expander("❓ Help & Support", expanded=False):
+        st.markdown(_HELP_SUPPORT_MD)
+    
+    # System Tools
+    with st.sidebar.expander("🔧 System Tools", expanded=False):
+        if st.button("🧹 Clear Cache", use_container_width=True):
+            DOCS_CACHE.clear()
+            st.success("Documentation cache cleared")
+            log_system_message("SYSTEM: Documentation cache cleared")
+        
+        if st.button("📤 Export Reviews", use_container_width=True):
+            try:
+                conn = get_db_connection()
+                # Exports are full dumps: join the body table so the
+                # document text and review notes travel with each row
+                rows = conn.execute(
+                    "SELECT r.id, r.timestamp, r.document_type, r.document_title, "
+                    "r.author, r.review_status, b.original_text, b.review_notes "
+                    "FROM editorial_reviews r "
+                    "LEFT JOIN editorial_review_bodies b ON b.id = r.id "
+                    "ORDER BY r.timestamp DESC"
+                ).fetchall()
+            except Exception as e:
+                log_system_message(f"Database error: {str(e)}")
+                rows = []
+            if rows:
+                # Compact JSON straight from the cursor — no DataFrame, no
+                # indent whitespace doubling the payload
+                json_data = json.dumps([dict(row) for row in rows])
+                st.download_button(
+                    label="📋 Download Reviews",
+                    data=json_data,
+                    file_name="editorial_reviews_export.json",
+                    mime="application/json",
+                    use_container_width=True
+                )
+            else:
+                st.info("No reviews to export")
+
+def _chat_context(document_text):
+    """Return the 500-char chat context, re-slicing only when the doc changes."""
+    if not document_text:
+        return None
+    doc_hash = hash(document_text)
+    if st.session_state.get('_doc_ctx_hash') != doc_hash:
+        st.session_state['_doc_ctx'] = document_text[:500]
+        st.session_state['_doc_ctx_hash'] = doc_hash
+    return st.session_state['_doc_ctx']
+
+@st.fragment
+def render_chat():
+    """Chat history, isolated so unrelated interactions skip re-rendering it."""
+    st.subheader("💬 Review & Chat")
+
+    for message in st.session_state['messages']:
+        with st.chat_message(message["role"]):
+            st.write(message["content"])
+
+@st.fragment
+def render_recent_activity():
+    """Recent system-log entries, re-rendered only within this fragment."""
+    with st.expander("📊 Recent Activity", expanded=False):
+        # Show recent system logs; format only the entries actually displayed
+        recent_logs = list(_LOG_BUFFER)[-6:]
+        for _, message in recent_logs:
+            # Clean up log display - drop agent names for a cleaner view
+            clean_log = message.split(':', 1)[-1].strip()
+            st.caption(clean_log)
+
+def main():
+    """Main Streamlit application for Tech 101 Assistant."""
+    # Page configuration
+    st.set_page_config(
+        page_title="Tech 101 Assistant",
+        page_icon="📚",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    # Custom CSS for styling — Streamlit removes elements that are not
+    # re-emitted on a rerun, so the style block goes out every run
+    st.markdown(_PAGE_CSS, unsafe_allow_html=True)
     
     # Header
     st.title("📚 Tech 101 Assistant")
@@ -737,16 +1351,19 @@ def main():
     # Initialize session state
     if 'messages' not in st.session_state:
         st.session_state['messages'] = []
-    if 'system_logs' not in st.session_state:
-        st.session_state['system_logs'] = []
     
     # Initialize database
-    if not init_database():
+    if not ensure_schema():
         st.warning("Failed to initialize editorial database.")
     
     # Render sidebar
     render_sidebar()
-    
+
+    # Warm the documentation cache once per session
+    if 'docs_prefetched' not in st.session_state:
+        run_async(prefetch_all_docs())
+        st.session_state['docs_prefetched'] = True
+
     # Main content area
     col1, col2 = st.columns([2, 1])
     
@@ -754,15 +1371,31 @@ def main():
         # Document input section
         st.subheader("📝 Document Review")
         
-        # Essential metadata
-        col1a, col1b = st.columns(2)
-        with col1a:
-            doc_title = st.text_input("Title", placeholder="API Integration Guide")
-        with col1b:
-            doc_type = st.selectbox("Type", [
-                "API Docs", "User Guide", "Tutorial", "Installation", 
-                "Troubleshooting", "Reference", "Getting Started", "Other"
-            ])
+        # Inputs live in a form so typing in the title or document no longer
+        # reruns the whole script; only the submit buttons do
+        with st.form("review_form"):
+            col1a, col1b = st.columns(2)
+            with col1a:
+                doc_title = st.text_input("Title", placeholder="API Integration Guide")
+            with col1b:
+                doc_type = st.selectbox("Type", [
+                    "API Docs", "User Guide", "Tutorial", "Installation", 
+                    "Troubleshooting", "Reference", "Getting Started", "Other"
+                ])
+            
+            # Document input
+            document_text = st.text_area(
+                "Paste your documentation here:",
+                height=250,
+                placeholder="# Getting Started\n\nThis guide shows you how to...",
+                help="Paste your draft documentation for multi-agent AI review"
+            )
+            
+            col1a, col1b = st.columns(2)
+            with col1a:
+                quick_check = st.form_submit_button("🔍 Quick Check", use_container_width=True)
+            with col1b:
+                full_review = st.form_submit_button("✨ Full Review", use_container_width=True)
         
         # Store metadata
         if doc_title:
@@ -773,67 +1406,47 @@ def main():
                 'audience': 'General'
             }
         
-        # Document input
-        document_text = st.text_area(
-            "Paste your documentation here:",
-            height=250,
-            placeholder="# Getting Started\n\nThis guide shows you how to...",
-            help="Paste your draft documentation for multi-agent AI review"
-        )
+        # Action dispatch
+        if quick_check and document_text:
+            with st.spinner("Analyzing..."):
+                issues = analyze_technical_writing_issues(document_text, max_issues=3)
+                if issues:
+                    st.error(f"Found {len(issues)} issues to fix")
+                    for issue in issues[:3]:
+                        st.warning(f"**{issue['type']}**: {issue['suggestion']}")
+                else:
+                    st.success("✅ Looks good!")
         
-        # Action buttons
-        if document_text:
-            col1a, col1b = st.columns(2)
-            
-            with col1a:
-                if st.button("🔍 Quick Check", use_container_width=True):
-                    with st.spinner("Analyzing..."):
-                        issues = analyze_technical_writing_issues(document_text)
-                        if issues:
-                            st.error(f"Found {len(issues)} issues to fix")
-                            for issue in issues[:3]:
-                                st.warning(f"**{issue['type']}**: {issue['suggestion']}")
-                        else:
-                            st.success("✅ Looks good!")
-            
-            with col1b:
-                if st.button("✨ Full Review", use_container_width=True):
-                    if doc_title:
-                        with st.spinner("Running comprehensive analysis..."):
-                            review_result = asyncio.run(
-                                run_multi_agent_review(
-                                    document_text,
-                                    st.session_state['document_metadata']
-                                )
-                            )
-                            
-                            if "error" not in review_result:
-                                st.session_state['messages'].append({
-                                    "role": "assistant", 
-                                    "content": f"## ✨ Comprehensive Editorial Review\n\n{review_result.get('review', 'Review completed')}"
-                                })
-                                
-                                # Save to database
-                                save_editorial_review(
-                                    st.session_state['document_metadata']['type'],
-                                    doc_title,
-                                    'User',
-                                    document_text,
-                                    review_result.get('review', 'Comprehensive review completed')
-                                )
-                            else:
-                                st.error(f"Review error: {review_result['error']}")
-                        st.rerun()
+        if full_review and document_text:
+            if doc_title:
+                with st.spinner("Running comprehensive analysis..."):
+                    review_result = run_async(
+                        run_multi_agent_review(
+                            document_text,
+                            st.session_state['document_metadata']
+                        )
+                    )
+                    
+                    if "error" not in review_result:
+                        # Store for a potential rewrite — here on the
+                        # script thread, where session state is real
+                        if "review" in review_result:
+                            st.session_state['last_review'] = review_result["review"]
+                            st.session_state['last_document'] = document_text
+                            st.session_state['agent_reports'] = review_result.get("agent_reports", [])
+                        st.session_state['messages'].append({
+                            "role": "assistant",
+                            "content": f"## ✨ Comprehensive Editorial Review\n\n{review_result.get('review', 'Review completed')}"
+                        })
                     else:
-                        st.warning("Add a title first")
+                        st.error(f"Review error: {review_result['error']}")
+                st.rerun()
+            else:
+                st.warning("Add a title first")
         
         # Chat interface
         if st.session_state['messages']:
-            st.subheader("💬 Review & Chat")
-            
-            for message in st.session_state['messages']:
-                with st.chat_message(message["role"]):
-                    st.write(message["content"])
+            render_chat()
         
         # Chat input
         user_input = st.chat_input("Ask questions or request rewrite...")
@@ -842,23 +1455,28 @@ def main():
             
             with st.spinner("Processing your request..."):
                 # Check for rewrite request
-                rewrite_keywords = ["rewrite", "yes, rewrite", "yes please", "go ahead", "yes, go ahead", "create new version", "improve draft"]
-                is_rewrite_request = any(keyword in user_input.lower() for keyword in rewrite_keywords)
+                is_rewrite_request = bool(_REWRITE_RE.search(user_input))
                 
                 if is_rewrite_request and document_text and 'last_review' in st.session_state:
-                    # Handle rewrite request
-                    rewrite_result = asyncio.run(
-                        run_document_rewrite(
-                            document_text,
-                            st.session_state.get('document_metadata', {}),
-                            st.session_state['last_review']
-                        )
-                    )
-                    
-                    if "error" not in rewrite_result:
+                    # Handle rewrite request - stream tokens as they arrive
+                    rewrite_error = None
+                    try:
+                        with st.chat_message("assistant"):
+                            st.markdown("## ✏️ Improved Draft")
+                            improved_draft = st.write_stream(_iter_stream_sync(
+                                run_document_rewrite_stream(
+                                    document_text,
+                                    st.session_state.get('document_metadata', {}),
+                                    st.session_state['last_review']
+                                )
+                            ))
+                    except Exception as e:
+                        rewrite_error = str(e)
+
+                    if rewrite_error is None:
                         response = f"""## ✏️ Improved Draft
 
-{rewrite_result['improved_draft']}
+{improved_draft}
 
 ---
 
@@ -870,14 +1488,14 @@ def main():
 
 You can copy this improved version or ask for specific adjustments!"""
                     else:
-                        response = f"I apologize, but there was an error with the rewrite: {rewrite_result['error']}"
+                        response = f"I apologize, but there was an error with the rewrite: {rewrite_error}"
                 
                 else:
                     # Handle regular chat question
-                    chat_result = asyncio.run(
+                    chat_result = run_async(
                         handle_chat_question(
                             user_input, 
-                            context=document_text[:500] if document_text else None
+                            context=_chat_context(document_text)
                         )
                     )
                     
@@ -921,22 +1539,8 @@ You can copy this improved version or ask for specific adjustments!"""
             """)
         
         # System activity
-        if st.session_state['system_logs']:
-            with st.expander("📊 Recent Activity", expanded=False):
-                # Show recent system logs
-                recent_logs = st.session_state['system_logs'][-6:]
-                for log in recent_logs:
-                    # Clean up log display - remove timestamps and agent names for cleaner view
-                    if ']' in log:
-                        clean_log = log.split(']', 1)[1].strip()
-                        # Further clean by removing agent names
-                        if ':' in clean_log:
-                            parts = clean_log.split(':', 1)
-                            if len(parts) > 1:
-                                clean_log = parts[1].strip()
-                    else:
-                        clean_log = log
-                    st.caption(clean_log)
+        if _LOG_BUFFER:
+            render_recent_activity()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
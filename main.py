@@ -1,15 +1,21 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import time
 import asyncio
-import pandas as pd
 import sqlite3
 import json
 import re
+import aiohttp
 import requests
-from datetime import datetime
+import threading
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from cachetools import TTLCache
 from dotenv import load_dotenv
 import os
-from openai import OpenAI
 
 # ============================================================================
 # CONFIGURATION
@@ -20,10 +26,47 @@ load_dotenv(override=True)
 
 # API Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if OPENAI_API_KEY:
-    client = OpenAI(api_key=OPENAI_API_KEY)
-else:
-    client = None
+
+@st.cache_resource(show_spinner=False)
+def get_openai():
+    """OpenAI client, created once and reused across reruns.
+
+    Constructed lazily so reruns don't pay the openai import unless a
+    feature actually needs the API.
+    """
+    if not OPENAI_API_KEY:
+        return None
+    from openai import OpenAI
+    return OpenAI(api_key=OPENAI_API_KEY)
+
+@st.cache_resource(show_spinner=False)
+def get_async_client():
+    """AsyncOpenAI client for the agents.
+
+    Awaiting completions keeps the event loop free, so the agents that
+    run_multi_agent_review gathers actually overlap instead of blocking
+    each other for seconds per call.
+    """
+    if not OPENAI_API_KEY:
+        return None
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+@st.cache_resource(show_spinner=False)
+def get_event_loop():
+    """Event loop on a background thread, shared across reruns.
+
+    Hosting every agent coroutine on one long-lived loop keeps the shared
+    aiohttp session and the AsyncOpenAI connection pool alive between
+    clicks instead of tearing them down with each asyncio.run.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True, name="agent-loop").start()
+    return loop
+
+def run_async(coro):
+    """Run a coroutine on the persistent loop and block for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
 
 # Documentation Repository Configuration
 GITHUB_REPO_BASE = "https://raw.githubusercontent.com/Renda02/tech-101-handbook/main"
@@ -35,11 +78,15 @@ DOCUMENTATION_URLS = {
     "quick_reference": f"{GITHUB_REPO_BASE}/editing-rules/quick-reference.md"
 }
 
+# Model routing: specialist analysis and the rewrite run on the cheaper,
+# faster model; the synthesis users read verbatim keeps the strong one
+MODEL_FAST = "gpt-4o-mini"
+MODEL_STRONG = "gpt-4o"
+
 # Database Configuration
 DB_FILE = "editorial_reviews.db"
 
-# Cache for documentation content
-DOCS_CACHE = {}
+# Documentation cache TTL
 CACHE_EXPIRY = 3600  # 1 hour in seconds
 
 # Page configuration
@@ -50,8 +97,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for styling
-st.markdown("""
+# Custom CSS for styling — re-emitted every run, since Streamlit removes
+# elements that are not part of the current rerun
+_PAGE_CSS = """
 <style>
     .main-header {
         text-align: center;
@@ -123,16 +171,27 @@ st.markdown("""
         border: 1px solid #e2e8f0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(_PAGE_CSS, unsafe_allow_html=True)
 
 # ============================================================================
 # DATABASE FUNCTIONS
 # ============================================================================
 
+@st.cache_resource(show_spinner=False)
+def get_db():
+    """SQLite connection shared for the session lifetime."""
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
 def init_database():
     """Initialize SQLite database for editorial reviews."""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS editorial_reviews (
@@ -145,104 +204,310 @@ def init_database():
             review_status TEXT DEFAULT 'completed'
         )
         ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_ts ON editorial_reviews(timestamp DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_reviews_doc_type ON editorial_reviews(document_type)')
         conn.commit()
-        conn.close()
         return True
     except Exception as e:
         st.error(f"❌ Database error: {e}")
         return False
 
-def save_review(doc_type, doc_title, original_text, review_notes):
-    """Save editorial review to database."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
+@st.cache_resource(show_spinner=False)
+def ensure_schema():
+    """Run init_database once per process; reruns just read the cached flag."""
+    return init_database()
+
+def save_reviews(rows):
+    """Insert several reviews in one transaction — one commit for the batch.
+
+    Each row is (timestamp, document_type, document_title, original_text,
+    review_notes). Useful once the multi-agent path persists per-agent
+    artifacts alongside the review itself.
+    """
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute('''
+        conn = get_db()
+        conn.executemany('''
         INSERT INTO editorial_reviews (timestamp, document_type, document_title, original_text, review_notes)
         VALUES (?, ?, ?, ?, ?)
-        ''', (timestamp, doc_type, doc_title, original_text, review_notes))
+        ''', rows)
         conn.commit()
-        conn.close()
+        st.session_state['reviews_version'] = _reviews_version() + 1
         return True
     except Exception as e:
         st.error(f"Database error: {str(e)}")
         return False
 
-def get_reviews():
-    """Retrieve all editorial reviews from database."""
+def save_review(doc_type, doc_title, original_text, review_notes):
+    """Save a single editorial review to the database."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return save_reviews([(timestamp, doc_type, doc_title, original_text, review_notes)])
+
+def _writer_loop(write_queue):
+    """Drain queued reviews into SQLite in batches.
+
+    Collects up to 16 rows (or whatever arrives within 100 ms of the
+    first) and lands them with one executemany under one commit, so the
+    fsync cost is paid per batch instead of per review. Uses its own
+    connection — WAL lets it write while readers use the shared one.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    while True:
+        rows = [write_queue.get()]
+        deadline = time.time() + 0.1
+        while len(rows) < 16:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                rows.append(write_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            conn.executemany('''
+            INSERT INTO editorial_reviews (timestamp, document_type, document_title, original_text, review_notes)
+            VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+            conn.commit()
+        except Exception as e:
+            log_system_message(f"Database error: failed to persist {len(rows)} review(s) - {str(e)}")
+
+@st.cache_resource(show_spinner=False)
+def _review_write_queue():
+    """The review write queue, created together with its writer thread.
+
+    Both live in one cache_resource factory so every rerun feeds the
+    same queue the long-lived writer drains — a module-level queue would
+    be rebuilt each rerun while the thread kept reading the original.
+    The bound means a backed-up writer pushes callers to the synchronous
+    fallback instead of dropping rows.
+    """
+    write_queue = queue.Queue(maxsize=64)
+    threading.Thread(
+        target=_writer_loop, args=(write_queue,), daemon=True, name="review-writer"
+    ).start()
+    return write_queue
+
+def save_review_async(doc_type, doc_title, original_text, review_notes):
+    """Queue a review for background persistence and return immediately.
+
+    The SQLite write (and its fsync) happens off the UI thread, so the
+    click-to-result path no longer waits on the disk; the version counter
+    is bumped optimistically so the sidebar stats refresh on next rerun.
+    """
+    if not isinstance(review_notes, str):
+        review_notes = json.dumps(review_notes, default=str)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     try:
-        conn = sqlite3.connect(DB_FILE)
-        df = pd.read_sql_query("SELECT * FROM editorial_reviews ORDER BY timestamp DESC", conn)
-        conn.close()
-        return df
+        _review_write_queue().put_nowait((timestamp, doc_type, doc_title, original_text, review_notes))
+    except queue.Full:
+        return save_review(doc_type, doc_title, original_text, review_notes)
+    st.session_state['reviews_version'] = _reviews_version() + 1
+    return True
+
+def _reviews_version():
+    """Session counter bumped on every write, used to invalidate reads."""
+    return st.session_state.setdefault('reviews_version', 0)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _reviews_stats(version):
+    """Aggregates behind the sidebar Quick Stats panel.
+
+    Computed directly in SQLite — an indexed count, a range count, and a
+    GROUP BY returning three rows — so nothing materializes the table
+    through pandas. A write bumps `version`, invalidating the cache.
+    """
+    try:
+        cursor = get_db().cursor()
+        total = cursor.execute("SELECT COUNT(*) FROM editorial_reviews").fetchone()[0]
+        # Timestamps are stored as "%Y-%m-%d %H:%M:%S", so ISO string
+        # comparison in SQL orders correctly and uses idx_ts
+        cutoff = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d %H:%M:%S")
+        week = cursor.execute(
+            "SELECT COUNT(*) FROM editorial_reviews WHERE timestamp >= ?", (cutoff,)
+        ).fetchone()[0]
+        return {'total': total, 'week': week, 'top_types': dict(top_doc_types())}
     except Exception:
-        return pd.DataFrame()
+        return {'total': 0, 'week': 0, 'top_types': {}}
+
+def top_doc_types(n=3):
+    """Most-reviewed document types as (type, count) rows.
+
+    An indexed GROUP BY in SQLite, so only `n` rows ever cross into
+    Python — no column materialization or value_counts pass.
+    """
+    return get_db().execute(
+        "SELECT document_type, COUNT(*) FROM editorial_reviews "
+        "GROUP BY document_type ORDER BY 2 DESC LIMIT ?", (n,)
+    ).fetchall()
 
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
+# Optional "[timestamp]" then optional "Agent:" prefix, capturing the rest;
+# one C-level match replaces the old split/strip sequence per entry
+_LOG_CLEAN_RE = re.compile(r'^(?:\[[^\]]*\]\s*)?(?:[^:]*:\s*)?(.*)$')
+
+def _clean_log(message):
+    """Strip the agent prefix ("Agent: detail" → "detail") for display."""
+    match = _LOG_CLEAN_RE.match(message)
+    return match.group(1).strip() if match else message
+
+@st.cache_resource(show_spinner=False)
+def _system_logs():
+    """Process-wide log ring buffer.
+
+    Agent and validator coroutines log from the background loop, where
+    st.session_state resolves to a context-less mock and writes vanish —
+    so the buffer lives at process scope instead of in the session.
+    """
+    return deque(maxlen=200)
+
+# Resolved here, on the script thread, so coroutines and worker threads
+# append without touching Streamlit's cache machinery contextless
+_LOG_BUFFER = _system_logs()
+
 def log_system_message(message):
-    """Add a timestamped message to system logs."""
-    if 'system_logs' not in st.session_state:
-        st.session_state['system_logs'] = []
-    
+    """Add a timestamped message to system logs.
+
+    The display form is computed once here, so the sidebar just joins
+    ready-made strings instead of re-parsing every entry per rerun.
+    """
     timestamp = datetime.now().strftime("%H:%M:%S")
-    st.session_state['system_logs'].append(f"[{timestamp}] {message}")
+    _LOG_BUFFER.append({
+        'raw': f"[{timestamp}] {message}",
+        'clean': _clean_log(message),
+    })
 
-def fetch_documentation(doc_key):
-    """Fetch documentation from GitHub with caching."""
-    now = datetime.now().timestamp()
-    
-    # Check cache first
-    if doc_key in DOCS_CACHE:
-        cache_entry = DOCS_CACHE[doc_key]
-        if now - cache_entry["timestamp"] < CACHE_EXPIRY:
-            log_system_message(f"DOCS: Using cached {doc_key}")
-            return cache_entry["content"]
-    
-    # Fetch from GitHub
+# One pooled session for all documentation downloads — keep-alive reuses
+# the TCP+TLS connection to raw.githubusercontent.com across the five
+# guides instead of paying a handshake per fetch
+@st.cache_resource(show_spinner=False)
+def _doc_http_session():
+    session = requests.Session()
+    session.headers.update({'User-Agent': 'DocumentationBot/1.0'})
+    return session
+
+_DOC_HTTP = _doc_http_session()
+
+@st.cache_data(ttl=CACHE_EXPIRY, show_spinner=False)
+def _fetch_documentation_cached(doc_key):
+    """Download a documentation file; results are cached process-wide."""
     url = DOCUMENTATION_URLS.get(doc_key)
     if not url:
-        log_system_message(f"DOCS: Unknown documentation key: {doc_key}")
         return None
-    
+    response = _DOC_HTTP.get(url, timeout=10)
+    response.raise_for_status()
+    return response.text
+
+def fetch_documentation(doc_key):
+    """Fetch documentation from GitHub through the process-wide cache."""
     try:
-        log_system_message(f"DOCS: Fetching {doc_key} from GitHub")
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        content = response.text
-        DOCS_CACHE[doc_key] = {
-            "content": content,
-            "timestamp": now
-        }
-        
-        log_system_message(f"DOCS: Successfully fetched {doc_key}")
+        content = _fetch_documentation_cached(doc_key)
+        if content is None:
+            log_system_message(f"DOCS: Unknown documentation key: {doc_key}")
         return content
-        
     except requests.RequestException as e:
         log_system_message(f"DOCS ERROR: Failed to fetch {doc_key}: {str(e)}")
         return None
 
+# Presence-only view of the documentation cache for the sidebar status
+# check marks: a bool per doc key, refreshed at most hourly, so rendering
+# status never re-fetches (or even re-touches) the multi-KB payloads
+@st.cache_resource(show_spinner=False)
+def _doc_presence_cache():
+    return TTLCache(maxsize=16, ttl=3600)
+
+_doc_presence = _doc_presence_cache()
+
+def has_doc(doc_key):
+    """Return whether a documentation file is reachable, cached as a bool."""
+    cached = _doc_presence.get(doc_key)
+    if cached is not None:
+        return cached
+    present = bool(fetch_documentation(doc_key))
+    _doc_presence[doc_key] = present
+    return present
+
+# Per-key locks so concurrent coroutines can't stampede a cold cache key
+# with duplicate downloads; the TTL store itself is the st.cache_data layer
+_DOC_FETCH_LOCKS = {}
+_DOC_FETCH_LOCKS_LOOP = None
+
+def _doc_fetch_lock(doc_key):
+    """Return the asyncio.Lock guarding one documentation key."""
+    global _DOC_FETCH_LOCKS, _DOC_FETCH_LOCKS_LOOP
+    loop = asyncio.get_running_loop()
+    if _DOC_FETCH_LOCKS_LOOP is not loop:
+        _DOC_FETCH_LOCKS = {}
+        _DOC_FETCH_LOCKS_LOOP = loop
+    if doc_key not in _DOC_FETCH_LOCKS:
+        _DOC_FETCH_LOCKS[doc_key] = asyncio.Lock()
+    return _DOC_FETCH_LOCKS[doc_key]
+
+async def fetch_documentation_async(doc_key):
+    """Async wrapper over the cached fetch; the blocking I/O runs off-loop.
+
+    On a warm cache this returns without touching the network; on a cold
+    key the per-key lock makes sure only one coroutine downloads while the
+    rest wait and then hit the cache.
+    """
+    async with _doc_fetch_lock(doc_key):
+        try:
+            return await asyncio.to_thread(_fetch_documentation_cached, doc_key)
+        except requests.RequestException as e:
+            log_system_message(f"DOCS ERROR: Failed to fetch {doc_key}: {str(e)}")
+            return None
+
+def _prewarm():
+    """Warm the documentation cache and the OpenAI connection pool.
+
+    Runs on a background thread at first page load, so it must not touch
+    st.session_state; by the time the user clicks a review button the
+    guides and the HTTPS pool to OpenAI are usually already warm.
+    """
+    with ThreadPoolExecutor(max_workers=len(DOCUMENTATION_URLS)) as pool:
+        futures = [pool.submit(_fetch_documentation_cached, key) for key in DOCUMENTATION_URLS]
+        for future in futures:
+            try:
+                future.result()
+            except requests.RequestException:
+                pass
+    client = get_openai()
+    if client:
+        try:
+            # Cheap call whose only job is establishing the HTTPS connection
+            client.models.list()
+        except Exception:
+            pass
+
 # ============================================================================
 # MULTI-AGENT ANALYSIS FUNCTIONS
 # ============================================================================
 
-async def run_content_analysis(document_text, doc_metadata):
-    """Content Analyzer Agent - analyzes content quality issues."""
-    log_system_message("Content Analyzer: Starting analysis")
+async def run_combined_analysis(document_text, doc_metadata, guides):
+    """Content Analyzer + Style Guide Enforcer in a single completion.
+
+    Both specialists read the same document with overlapping instructions,
+    so one multi-section prompt halves the LLM round trips and sends the
+    document once instead of twice. The JSON response is split back into
+    the two familiar agent reports.
+    """
+    log_system_message("Content Analyzer + Style Enforcer: Starting combined analysis")
+    client = get_async_client()
     
-    content_guide = fetch_documentation("content_classification_guide")
-    wordiness_examples = fetch_documentation("wordiness_examples")
-    clarity_examples = fetch_documentation("clarity_examples")
+    content_guide = guides.get("content_classification_guide")
+    wordiness_examples = guides.get("wordiness_examples")
+    clarity_examples = guides.get("clarity_examples")
+    style_guide = guides.get("style_guide")
+    quick_reference = guides.get("quick_reference")
     
     system_prompt = f"""
-    You are a Content Analyzer Agent specializing in technical documentation quality.
+    You are two specialist reviewers of technical documentation working in one pass.
 
-    Focus on identifying:
+    As the Content Analyzer, identify:
     1. Wordiness and filler text
     2. Vague language and unclear references  
     3. Missing context and logical gaps
@@ -250,6 +515,14 @@ async def run_content_analysis(document_text, doc_metadata):
     5. Redundant information
     6. Missing outcomes and value statements
 
+    As the Style Guide Enforcer, check:
+    1. Active vs passive voice
+    2. Present tense usage
+    3. Sentence length (max 26 words)
+    4. UI element specifications
+    5. Capitalization and formatting
+    6. Grammar and punctuation
+
     Content Guide Reference:
     {content_guide[:1500] if content_guide else "Guide not available"}
 
@@ -259,112 +532,260 @@ async def run_content_analysis(document_text, doc_metadata):
     Clarity Examples:
     {clarity_examples[:800] if clarity_examples else "Examples not available"}
 
-    Provide specific examples and actionable suggestions.
+    Style Guide Reference:
+    {style_guide[:1500] if style_guide else "Guide not available"}
+
+    Quick Reference:
+    {quick_reference[:800] if quick_reference else "Reference not available"}
+
+    Respond with a JSON object of the form
+    {{"content_findings": "...", "style_findings": "..."}}.
+    Provide specific examples, violations, and actionable corrections in each.
     """
     
     user_prompt = f"""
-    Analyze this {doc_metadata.get('type', 'document')} for content quality issues:
+    Review this {doc_metadata.get('type', 'document')} for content quality and style compliance:
     
     Title: {doc_metadata.get('title', 'Untitled')}
     
     Content:
     {document_text}
     
-    Focus on clarity, precision, and reader comprehension.
+    Focus on clarity, precision, voice, tense, and formatting standards.
     """
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
+        response = await client.chat.completions.create(
+            model=MODEL_FAST,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
-            max_tokens=1000,
-            temperature=0.2
+            max_tokens=2000,
+            temperature=0.2,
+            response_format={"type": "json_object"}
         )
         
-        analysis = response.choices[0].message.content
-        log_system_message("Content Analyzer: Analysis completed")
-        return {
-            "agent": "Content Analyzer",
-            "findings": analysis
-        }
+        findings = json.loads(response.choices[0].message.content)
+        log_system_message("Content Analyzer + Style Enforcer: Combined analysis completed")
+        return [
+            {"agent": "Content Analyzer", "findings": findings.get("content_findings", "")},
+            {"agent": "Style Guide Enforcer", "findings": findings.get("style_findings", "")}
+        ]
         
     except Exception as e:
-        log_system_message(f"Content Analyzer: Error - {str(e)}")
-        return {"agent": "Content Analyzer", "error": str(e)}
-
-async def run_style_analysis(document_text, doc_metadata):
-    """Style Guide Agent - checks style compliance."""
-    log_system_message("Style Guide Enforcer: Starting compliance check")
-    
-    style_guide = fetch_documentation("style_guide")
-    quick_reference = fetch_documentation("quick_reference")
-    
-    system_prompt = f"""
-    You are a Style Guide Enforcer Agent specializing in technical writing standards.
+        log_system_message(f"Combined analysis: Error - {str(e)}")
+        return [
+            {"agent": "Content Analyzer", "error": str(e)},
+            {"agent": "Style Guide Enforcer", "error": str(e)}
+        ]
 
-    Check for:
-    1. Active vs passive voice
-    2. Present tense usage
-    3. Sentence length (max 26 words)
-    4. UI element specifications
-    5. Capitalization and formatting
-    6. Grammar and punctuation
+# Hosts that never need probing: local/reserved names and documentation
+# placeholders that would only produce noise
+_SKIP_HOSTS = {"localhost", "127.0.0.1", "example.com"}
 
-    Style Guide Reference:
-    {style_guide[:1500] if style_guide else "Guide not available"}
+def _should_skip(url):
+    """True when a URL's host is local or a known placeholder domain."""
+    host = urlparse(url).hostname or ""
+    return host in _SKIP_HOSTS or any(host.endswith("." + skip) for skip in _SKIP_HOSTS)
 
-    Quick Reference:
-    {quick_reference[:800] if quick_reference else "Reference not available"}
+# 404 heuristics as (pattern, hints) pairs — one regex scan per rule instead
+# of stacked substring checks; first matching rule wins, like the old chain
+_404_RULES = [
+    (re.compile(r'github\.com/\S*/blob/'), [
+        "• Repository may have moved - check if it was renamed or transferred",
+        "• Branch may have changed (master → main)",
+        "• Try archive: https://web.archive.org/web/{url}",
+    ]),
+    (re.compile(r'github\.com'), [
+        "• Try archive: https://web.archive.org/web/{url}",
+    ]),
+    (re.compile(r'https?://[^/]*(?:docs\.|documentation\.|wiki\.)'), [
+        "• Documentation may have been restructured - check site's search",
+        "• Try removing version numbers from URL path",
+    ]),
+    (re.compile(r'/api/|/v1/|/v2/|/rest/'), [
+        "• API version may have changed - check for newer versions",
+        "• Endpoint may have been deprecated - check API changelog",
+    ]),
+]
 
-    Identify specific violations with corrections.
-    """
-    
-    user_prompt = f"""
-    Check this {doc_metadata.get('type', 'document')} for style guide compliance:
+def suggest_404_fixes(url):
+    """Suggest intelligent fixes for 404 errors."""
+    parsed = urlparse(url)
     
-    Title: {doc_metadata.get('title', 'Untitled')}
+    # Wrapping an archive link in another archive link helps nobody
+    if 'web.archive.org' in parsed.netloc:
+        return "Already archived — consider an alternative primary source"
     
-    Content:
-    {document_text}
+    suggestions = []
+    for pattern, hints in _404_RULES:
+        if pattern.search(url):
+            suggestions.extend(hint.format(url=url) for hint in hints)
+            break
     
-    Focus on voice, tense, and formatting standards.
-    """
+    # General suggestions
+    suggestions.append(f"• Check site manually: {parsed.scheme}://{parsed.netloc}")
+    suggestions.append(f"• Search archive: https://web.archive.org/web/{url}")
     
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=1000,
-            temperature=0.1
+    return "\n".join(suggestions)
+
+def suggest_error_fixes(url, error_msg):
+    """Suggest fixes based on error type."""
+    if "SSL" in error_msg or "certificate" in error_msg.lower():
+        return "SSL certificate issue - site may be misconfigured or unsafe"
+    elif "Name or service not known" in error_msg or "DNS" in error_msg:
+        return "Domain no longer exists - find alternative or remove link"
+    elif "Connection refused" in error_msg:
+        return "Server is down - check if this is temporary or permanent"
+    else:
+        return "Network error - verify URL is correct"
+
+# Shared aiohttp session for link probes. Reusing one connector keeps
+# sockets (and their TLS handshakes) alive across validator runs for repeat
+# hosts. The holder is cache_resource: a bare global would be reset each
+# rerun, leaking one unclosed session per run and pooling nothing across
+# clicks. Rebuilt lazily if the event loop ever changes (asyncio.run-driven
+# callers tear their loop down between runs).
+@st.cache_resource(show_spinner=False)
+def _link_session_state():
+    """Holder for the loop-bound link-check session, surviving reruns."""
+    return {"session": None, "loop": None}
+
+_LINK_SESSION_STATE = _link_session_state()
+
+async def get_session():
+    """Return the shared link-check session, rebuilding it if needed."""
+    state = _LINK_SESSION_STATE
+    loop = asyncio.get_running_loop()
+    if state["session"] is None or state["session"].closed or state["loop"] is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=64, limit_per_host=8, ttl_dns_cache=300, enable_cleanup_closed=True
+        )
+        state["session"] = aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': 'DocumentationBot/1.0'}
         )
+        state["loop"] = loop
+    return state["session"]
+
+# Per-host probe caps so one slow or rate-limiting domain can't absorb the
+# whole connection pool. Like the session, reset when the loop changes.
+_HOST_SEMAPHORES = {}
+_HOST_SEMAPHORES_LOOP = None
+
+def _host_semaphore(host):
+    """Return the semaphore bounding concurrent probes against one host."""
+    global _HOST_SEMAPHORES, _HOST_SEMAPHORES_LOOP
+    loop = asyncio.get_running_loop()
+    if _HOST_SEMAPHORES_LOOP is not loop:
+        _HOST_SEMAPHORES = {}
+        _HOST_SEMAPHORES_LOOP = loop
+    if host not in _HOST_SEMAPHORES:
+        _HOST_SEMAPHORES[host] = asyncio.Semaphore(4)
+    return _HOST_SEMAPHORES[host]
+
+# Probe results are kept for an hour: documents get re-reviewed far more
+# often than their links change state. cache_resource-held — a module
+# global would start empty on every rerun, and every validator run is a
+# new rerun, so the TTL would never apply.
+LINK_CACHE_EXPIRY = 3600
+
+@st.cache_resource(show_spinner=False)
+def _link_result_cache():
+    """Probe-result store shared across validator runs."""
+    return {}
+
+_LINK_RESULT_CACHE = _link_result_cache()
+
+async def check_single_link(session, url):
+    """Return the cached probe result for a URL, probing on miss."""
+    now = time.time()
+    cached = _LINK_RESULT_CACHE.get(url)
+    if cached is not None and now - cached[0] < LINK_CACHE_EXPIRY:
+        return cached[1]
+    result = await _probe_link(session, url)
+    if result["code"] != "ERROR":
+        _LINK_RESULT_CACHE[url] = (now, result)
+    return result
+
+async def _probe_link(session, url):
+    """Probe a single URL on the event loop and suggest fixes if broken."""
+    try:
+        async with _host_semaphore(urlparse(url).netloc):
+            for attempt in range(3):
+                try:
+                    # HEAD first: a status check needs headers, not the body
+                    async with session.head(
+                        url,
+                        timeout=aiohttp.ClientTimeout(total=10),
+                        allow_redirects=True,
+                    ) as response:
+                        status = response.status
+                    if status == 405:
+                        # Server rejects HEAD; a ranged GET keeps the body
+                        # down to a single byte
+                        async with session.get(
+                            url,
+                            timeout=aiohttp.ClientTimeout(total=10),
+                            allow_redirects=True,
+                            headers={'Range': 'bytes=0-0'},
+                        ) as response:
+                            status = 200 if response.status == 206 else response.status
+                except asyncio.TimeoutError:
+                    if attempt == 2:
+                        raise
+                    status = None
+                if status is not None and status < 500:
+                    break
+                # Transient server error or timeout — back off and retry
+                await asyncio.sleep(2 ** attempt)
         
-        compliance_check = response.choices[0].message.content
-        log_system_message("Style Guide Enforcer: Check completed")
+        if status == 200:
+            return {
+                "url": url,
+                "status": "✅ Working",
+                "code": status,
+                "suggestion": None
+            }
+        elif status == 404:
+            return {
+                "url": url,
+                "status": "❌ Not Found (404)",
+                "code": 404,
+                "suggestion": suggest_404_fixes(url)
+            }
+        elif status in (401, 403):
+            return {
+                "url": url,
+                "status": f"🔒 Access Restricted ({status})",
+                "code": status,
+                "suggestion": "Verify if authentication is required or if link should be public"
+            }
+        else:
+            return {
+                "url": url,
+                "status": f"❌ HTTP {status}",
+                "code": status,
+                "suggestion": "Check server status or find alternative"
+            }
+    except Exception as e:
         return {
-            "agent": "Style Guide Enforcer",
-            "findings": compliance_check
+            "url": url,
+            "status": f"❌ Error: {str(e)[:50]}",
+            "code": "ERROR",
+            "suggestion": suggest_error_fixes(url, str(e))
         }
-        
-    except Exception as e:
-        log_system_message(f"Style Guide Enforcer: Error - {str(e)}")
-        return {"agent": "Style Guide Enforcer", "error": str(e)}
 
 async def run_link_validation(document_text, doc_metadata):
     """Link Validator Agent - checks external links and suggests fixes."""
     log_system_message("Link Validator: Starting link validation")
     
-    import re
-    from urllib.parse import urlparse
-    
     # Extract all URLs from document
-    url_pattern = r'https?://[^\s\)\]\}">]+'
-    urls = re.findall(url_pattern, document_text)
+    urls = _URL_RE.findall(document_text)
+    # A link cited ten times only needs one probe, and placeholder or
+    # local hosts aren't worth a network call at all
+    urls = [url for url in dict.fromkeys(urls) if not _should_skip(url)]
     
     if not urls:
         log_system_message("Link Validator: No external links found")
@@ -375,138 +796,32 @@ async def run_link_validation(document_text, doc_metadata):
     
     log_system_message(f"Link Validator: Found {len(urls)} links to check")
     
-    def check_single_link(url):
-        """Check a single URL and suggest fixes if broken."""
-        try:
-            import urllib.request
-            import urllib.error
-            
-            # Create request with user agent
-            req = urllib.request.Request(
-                url, 
-                headers={'User-Agent': 'DocumentationBot/1.0'}
-            )
-            
-            with urllib.request.urlopen(req, timeout=10) as response:
-                status = response.getcode()
-                
-                if status == 200:
-                    return {
-                        "url": url,
-                        "status": "✅ Working",
-                        "code": status,
-                        "suggestion": None
-                    }
-                else:
-                    return {
-                        "url": url,
-                        "status": f"⚠️ HTTP {status}",
-                        "code": status,
-                        "suggestion": "Check if this is the intended behavior"
-                    }
-                    
-        except urllib.error.HTTPError as e:
-            if e.code == 404:
-                suggestions = suggest_404_fixes(url)
-                return {
-                    "url": url,
-                    "status": "❌ Not Found (404)",
-                    "code": 404,
-                    "suggestion": suggestions
-                }
-            elif e.code in [401, 403]:
-                return {
-                    "url": url,
-                    "status": f"🔒 Access Restricted ({e.code})",
-                    "code": e.code,
-                    "suggestion": "Verify if authentication is required or if link should be public"
-                }
-            else:
-                return {
-                    "url": url,
-                    "status": f"❌ HTTP {e.code}",
-                    "code": e.code,
-                    "suggestion": "Check server status or find alternative"
-                }
-        except Exception as e:
-            return {
-                "url": url,
-                "status": f"❌ Error: {str(e)[:50]}",
-                "code": "ERROR",
-                "suggestion": suggest_error_fixes(url, str(e))
-            }
-    
-    def suggest_404_fixes(url):
-        """Suggest intelligent fixes for 404 errors."""
-        parsed = urlparse(url)
-        domain = parsed.netloc
-        path = parsed.path
-        
-        suggestions = []
-        
-        # GitHub specific fixes
-        if 'github.com' in domain:
-            if '/blob/' in path:
-                suggestions.append("• Repository may have moved - check if it was renamed or transferred")
-                suggestions.append("• Branch may have changed (master → main)")
-            suggestions.append(f"• Try archive: https://web.archive.org/web/{url}")
-        
-        # Documentation sites
-        elif any(doc_site in domain for doc_site in ['docs.', 'documentation.', 'wiki.']):
-            suggestions.append("• Documentation may have been restructured - check site's search")
-            suggestions.append("• Try removing version numbers from URL path")
-        
-        # API endpoints
-        elif '/api/' in path or any(api_term in path for api_term in ['/v1/', '/v2/', '/rest/']):
-            suggestions.append("• API version may have changed - check for newer versions")
-            suggestions.append("• Endpoint may have been deprecated - check API changelog")
-        
-        # General suggestions
-        suggestions.append(f"• Check site manually: {parsed.scheme}://{domain}")
-        suggestions.append(f"• Search archive: https://web.archive.org/web/{url}")
-        
-        return "\n".join(suggestions) if suggestions else "Consider removing or finding an alternative"
-    
-    def suggest_error_fixes(url, error_msg):
-        """Suggest fixes based on error type."""
-        if "SSL" in error_msg or "certificate" in error_msg.lower():
-            return "SSL certificate issue - site may be misconfigured or unsafe"
-        elif "Name or service not known" in error_msg or "DNS" in error_msg:
-            return "Domain no longer exists - find alternative or remove link"
-        elif "Connection refused" in error_msg:
-            return "Server is down - check if this is temporary or permanent"
-        else:
-            return "Network error - verify URL is correct"
-    
-    # Check all links
+    # Check all links concurrently; every probe is pure I/O wait
     try:
-        working_links = []
-        issues = []
+        session = await get_session()
+        results = await asyncio.gather(*(check_single_link(session, url) for url in urls))
         
-        for url in urls:
-            result = check_single_link(url)
-            if result["status"].startswith("✅"):
-                working_links.append(result)
-            else:
-                issues.append(result)
+        working_links = [r for r in results if r["status"].startswith("✅")]
+        issues = [r for r in results if not r["status"].startswith("✅")]
         
-        # Format findings
-        findings = f"**Link Validation Report** ({len(urls)} links checked)\n\n"
+        # Format findings as a list of blocks joined once
+        parts = [f"**Link Validation Report** ({len(urls)} links checked)\n\n"]
         
         if working_links:
-            findings += f"✅ **{len(working_links)} working links** - No action needed\n\n"
+            parts.append(f"✅ **{len(working_links)} working links** - No action needed\n\n")
         
         if issues:
-            findings += f"⚠️ **{len(issues)} links need attention:**\n\n"
-            for issue in issues:
-                findings += f"**{issue['status']}**\n"
-                findings += f"URL: `{issue['url']}`\n"
-                if issue.get('suggestion'):
-                    findings += f"💡 **Suggestion:** {issue['suggestion']}\n"
-                findings += "\n"
+            parts.append(f"⚠️ **{len(issues)} links need attention:**\n\n")
+            parts.extend(
+                f"**{issue['status']}**\nURL: `{issue['url']}`\n"
+                + (f"💡 **Suggestion:** {issue['suggestion']}\n" if issue.get('suggestion') else "")
+                + "\n"
+                for issue in issues
+            )
+        else:
+            parts.append("🎉 **All links are working perfectly!**")
         
-        if not issues:
-            findings += "🎉 **All links are working perfectly!**"
+        findings = "".join(parts)
         
         log_system_message(f"Link Validator: Completed - {len(working_links)} working, {len(issues)} issues")
         
@@ -525,6 +840,7 @@ async def run_link_validation(document_text, doc_metadata):
 async def run_editorial_synthesis(document_text, doc_metadata, agent_reports):
     """Senior Editor Agent - synthesizes all agent findings."""
     log_system_message("Senior Editor: Synthesizing review")
+    client = get_async_client()
     
     system_prompt = """
     You are a Senior Editor Agent coordinating technical documentation review.
@@ -539,77 +855,17 @@ async def run_editorial_synthesis(document_text, doc_metadata, agent_reports):
     Create a professional review combining all specialist insights.
     """
     
-    # Combine agent reports
-    combined_findings = ""
-    for report in agent_reports:
-        if "findings" in report:
-            combined_findings += f"\n--- {report['agent']} Report ---\n{report['findings']}\n"
-        elif "error" in report:
-            combined_findings += f"\n--- {report['agent']} ---\nError: {report['error']}\n"
-    
-    user_prompt = f"""
-    Create comprehensive editorial review based on specialist agent reports:
-    
-    Document: {doc_metadata.get('title', 'Untitled')} ({doc_metadata.get('type', 'Unknown')})
-    
-    SPECIALIST FINDINGS:
-    {combined_findings}
-    
-    DOCUMENT PREVIEW:
-    {document_text[:800]}...
-    
-    Provide:
-    1. Executive summary
-    2. Priority issues
-    3. Specific improvements
-    4. Overall assessment
-    """
-    
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=1500,
-            temperature=0.3
-        )
-        
-        editorial_review = response.choices[0].message.content
-        log_system_message("Senior Editor: Review completed")
-        return {
-            "agent": "Senior Editor",
-            "review": editorial_review,
-            "agent_reports": agent_reports
-        }
-        
-    except Exception as e:
-        log_system_message(f"Senior Editor: Error - {str(e)}")
-        return {"agent": "Senior Editor", "error": str(e)}
-    """Senior Editor Agent - synthesizes all agent findings."""
-    log_system_message("Senior Editor: Synthesizing review")
-    
-    system_prompt = """
-    You are a Senior Editor Agent coordinating technical documentation review.
-
-    Responsibilities:
-    1. Synthesize findings from specialist agents
-    2. Prioritize issues by impact
-    3. Provide clear, actionable recommendations
-    4. Create comprehensive editorial guidance
-    5. Offer to provide a rewritten draft
-
-    Create a professional review combining all specialist insights.
-    """
+    # Combine agent reports — single O(n) join, no intermediate copies
+    combined_findings = "".join(
+        f"\n--- {report['agent']} Report ---\n{report['findings']}\n"
+        if "findings" in report
+        else f"\n--- {report['agent']} ---\nError: {report['error']}\n"
+        for report in agent_reports
+    )
     
-    # Combine agent reports
-    combined_findings = ""
-    for report in agent_reports:
-        if "findings" in report:
-            combined_findings += f"\n--- {report['agent']} Report ---\n{report['findings']}\n"
-        elif "error" in report:
-            combined_findings += f"\n--- {report['agent']} ---\nError: {report['error']}\n"
+    # The specialists already saw the full document; a heading outline
+    # gives the editor the structure without re-sending hundreds of tokens
+    section_outline = "\n".join(_HEADING_RE.findall(document_text))
     
     user_prompt = f"""
     Create comprehensive editorial review based on specialist agent reports:
@@ -619,8 +875,8 @@ async def run_editorial_synthesis(document_text, doc_metadata, agent_reports):
     SPECIALIST FINDINGS:
     {combined_findings}
     
-    DOCUMENT PREVIEW:
-    {document_text[:800]}...
+    SECTION OUTLINE:
+    {section_outline if section_outline else "(no headings)"}
     
     Provide:
     1. Executive summary
@@ -630,17 +886,26 @@ async def run_editorial_synthesis(document_text, doc_metadata, agent_reports):
     """
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
+        response = await client.chat.completions.create(
+            model=MODEL_STRONG,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
             max_tokens=1500,
-            temperature=0.3
+            temperature=0.3,
+            stream=True
         )
         
-        editorial_review = response.choices[0].message.content
+        # Consume the stream as tokens arrive instead of blocking on the
+        # full 1500-token completion; downstream still needs the complete
+        # review (the rewrite prompt embeds it), so accumulate here
+        parts = []
+        async for chunk in response:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+        editorial_review = "".join(parts)
         log_system_message("Senior Editor: Review completed")
         return {
             "agent": "Senior Editor",
@@ -657,17 +922,26 @@ async def run_multi_agent_review(document_text, doc_metadata):
     log_system_message("Orchestrator: Starting multi-agent review")
     
     try:
-        # Phase 1: Run content, style, and link analysis in parallel
-        content_task = run_content_analysis(document_text, doc_metadata)
-        style_task = run_style_analysis(document_text, doc_metadata)
+        # Fetch every guide once, concurrently, before any agent fires —
+        # the agents then work from the shared copies instead of each
+        # re-requesting overlapping guides
+        guide_keys = list(DOCUMENTATION_URLS)
+        guide_texts = await asyncio.gather(
+            *(fetch_documentation_async(key) for key in guide_keys)
+        )
+        guides = dict(zip(guide_keys, guide_texts))
+        
+        # Phase 1: Run the combined content/style analysis and link
+        # validation in parallel (the validator is not an LLM call)
+        combined_task = run_combined_analysis(document_text, doc_metadata, guides)
         link_task = run_link_validation(document_text, doc_metadata)
         
-        content_result, style_result, link_result = await asyncio.gather(
-            content_task, style_task, link_task
+        specialist_reports, link_result = await asyncio.gather(
+            combined_task, link_task
         )
         
         # Phase 2: Editorial synthesis
-        agent_reports = [content_result, style_result, link_result]
+        agent_reports = [*specialist_reports, link_result]
         editorial_result = await run_editorial_synthesis(document_text, doc_metadata, agent_reports)
         
         log_system_message("Orchestrator: Multi-agent review completed")
@@ -678,43 +952,92 @@ async def run_multi_agent_review(document_text, doc_metadata):
         log_system_message(f"Orchestrator: Error - {str(e)}")
         return {"error": str(e)}
 
+async def review_all(docs, max_concurrency=50):
+    """Review many documents at once under one global concurrency cap.
+
+    Each item is a (document_text, doc_metadata) pair. Reviews and their
+    internal agent calls all overlap, so batch throughput is bounded by
+    the OpenAI tier limit rather than by serial per-document latency.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def review_one(document_text, doc_metadata):
+        async with semaphore:
+            return await run_multi_agent_review(document_text, doc_metadata)
+    
+    return await asyncio.gather(*(review_one(text, meta) for text, meta in docs))
+
 # ============================================================================
 # ANALYSIS FUNCTIONS
 # ============================================================================
 
+# Precompiled patterns shared by the quick scan and the link validator;
+# compiled once at import instead of per call. The style checks are fused
+# into one alternation so a scan is a single linear pass, not four.
+_URL_RE = re.compile(r'https?://[^\s\)\]\}">]+')
+_COMBINED_RE = re.compile(
+    r'(?P<passive>(?:should|can|will)\s+be\s+\w+ed)'
+    r'|(?P<future>\bwill\s+\w+)'
+    r'|(?P<filler>\b(?:actually|basically|really|very)\b)'
+    r'|(?P<vague>\bthe\s+(?:button|link|field)\b)',
+    re.IGNORECASE,
+)
+_SENTENCE_SPLIT = re.compile(r'[.!?]+')
+_HEADING_RE = re.compile(r'^#+\s+.*', re.MULTILINE)
+
+@st.cache_data(ttl=600, max_entries=128, show_spinner=False)
 def quick_analysis(text):
-    """Quick technical writing analysis."""
+    """Quick technical writing analysis.
+
+    Pure function of the text, so repeat clicks on an unchanged document
+    return the cached issue list without re-scanning.
+    """
     issues = []
     
-    # Check for passive voice
-    if re.search(r'(should be|can be|will be)\s+\w+ed', text, re.IGNORECASE):
-        issues.append("⚠️ **Passive Voice**: Use active voice for clearer instructions")
+    # One pass over the text buckets every style finding by named group
+    found = {"passive": False, "future": False, "vague": False}
+    found_fillers = []
+    for match in _COMBINED_RE.finditer(text):
+        group = match.lastgroup
+        if group == "filler":
+            word = match.group().lower()
+            if word not in found_fillers:
+                found_fillers.append(word)
+        else:
+            found[group] = True
     
-    # Check for future tense
-    if re.search(r'\bwill\s+\w+', text, re.IGNORECASE):
+    if found["passive"]:
+        issues.append("⚠️ **Passive Voice**: Use active voice for clearer instructions")
+    if found["future"]:
         issues.append("⚠️ **Future Tense**: Use present tense ('returns' not 'will return')")
-    
-    # Check for filler words
-    fillers = ["actually", "basically", "really", "very"]
-    found_fillers = [word for word in fillers if re.search(rf'\b{word}\b', text, re.IGNORECASE)]
     if found_fillers:
         issues.append(f"⚠️ **Wordiness**: Remove unnecessary words: {', '.join(found_fillers)}")
-    
-    # Check for vague references
-    if re.search(r'\b(the button|the link|the field)\b', text, re.IGNORECASE):
+    if found["vague"]:
         issues.append("⚠️ **Vague Reference**: Be specific ('Save button' not 'the button')")
     
     # Check sentence length
-    sentences = re.split(r'[.!?]+', text)
+    sentences = _SENTENCE_SPLIT.split(text)
     long_sentences = [s for s in sentences if len(s.split()) > 25]
     if long_sentences:
         issues.append(f"⚠️ **Long Sentences**: {len(long_sentences)} sentences over 25 words")
     
     return issues
 
+@st.cache_resource(show_spinner=False)
+def _ai_result_cache():
+    """Completed (analysis, rewrite) pairs keyed by (title, type, text).
+
+    Held in cache_resource because a repeat click is by definition a new
+    rerun, and a module-level store would be rebuilt empty each time; an
+    hour of TTL matches the documentation cache window.
+    """
+    return TTLCache(maxsize=32, ttl=3600)
+
+_AI_RESULT_CACHE = _ai_result_cache()
+
 async def multi_agent_analysis(text, doc_title, doc_type):
     """Multi-agent AI analysis using GitHub style guides."""
-    if not client:
+    if not get_openai():
         return "❌ OpenAI API not configured. Add your API key to use AI analysis."
     
     try:
@@ -738,26 +1061,25 @@ async def multi_agent_analysis(text, doc_title, doc_type):
     except Exception as e:
         return f"❌ Multi-agent analysis error: {str(e)}"
 
-async def generate_rewrite(original_text, doc_title, doc_type, feedback, analysis_result=None):
-    """Generate improved version using style guides and link fixes."""
-    if not client:
-        return "❌ OpenAI API not configured. Add your API key to use rewrite functionality."
-    
-    try:
-        # Fetch style guides for rewrite
-        style_guide = fetch_documentation("style_guide")
-        content_guide = fetch_documentation("content_classification_guide")
-        
-        # Extract link fixes from analysis if available
-        link_fixes = ""
-        if analysis_result and 'agent_reports' in analysis_result:
-            for report in analysis_result.get('agent_reports', []):
-                if report.get('agent') == 'Link Validator':
-                    findings = report.get('findings', '')
-                    if 'need attention' in findings and '💡 **Suggestion:**' in findings:
-                        link_fixes = f"\n\nLINK FIXES REQUIRED:\n{findings}"
-        
-        prompt = f"""
+async def _build_rewrite_prompt(original_text, doc_title, doc_type, feedback, analysis_result=None):
+    """Assemble the rewrite prompt shared by both rewrite entry points."""
+    # Fetch both guides concurrently without blocking the loop; after
+    # an analysis pass these are warm cache hits anyway
+    style_guide, content_guide = await asyncio.gather(
+        fetch_documentation_async("style_guide"),
+        fetch_documentation_async("content_classification_guide"),
+    )
+
+    # Extract link fixes from analysis if available
+    link_fixes = ""
+    if analysis_result and 'agent_reports' in analysis_result:
+        for report in analysis_result.get('agent_reports', []):
+            if report.get('agent') == 'Link Validator':
+                findings = report.get('findings', '')
+                if 'need attention' in findings and '💡 **Suggestion:**' in findings:
+                    link_fixes = f"\n\nLINK FIXES REQUIRED:\n{findings}"
+
+    return f"""
         You are a Technical Writer Agent specializing in document improvement.
 
         CRITICAL RULES: 
@@ -799,104 +1121,118 @@ async def generate_rewrite(original_text, doc_title, doc_type, feedback, analysi
         - Fixed broken links
         - No additional information
         """
-        
-        response = client.chat.completions.create(
-            model="gpt-4",
+
+async def generate_rewrite(original_text, doc_title, doc_type, feedback, analysis_result=None):
+    """Generate improved version using style guides and link fixes."""
+    client = get_async_client()
+    if not client:
+        return "❌ OpenAI API not configured. Add your API key to use rewrite functionality."
+
+    try:
+        prompt = await _build_rewrite_prompt(
+            original_text, doc_title, doc_type, feedback, analysis_result
+        )
+
+        response = await client.chat.completions.create(
+            model=MODEL_FAST,
             messages=[{"role": "user", "content": prompt}],
             max_tokens=2500,
             temperature=0.1
         )
-        
+
         return response.choices[0].message.content
-        
+
     except Exception as e:
         return f"❌ Rewrite error: {str(e)}"
 
+async def generate_rewrite_stream(original_text, doc_title, doc_type, feedback, analysis_result=None):
+    """Yield the improved version chunk by chunk as the model produces it.
+
+    Same prompt as generate_rewrite, but streamed so the UI can show
+    tokens at time-to-first-token instead of after the full completion.
+    """
+    client = get_async_client()
+    if not client:
+        yield "❌ OpenAI API not configured. Add your API key to use rewrite functionality."
+        return
+
+    try:
+        prompt = await _build_rewrite_prompt(
+            original_text, doc_title, doc_type, feedback, analysis_result
+        )
+
+        response = await client.chat.completions.create(
+            model=MODEL_FAST,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=2500,
+            temperature=0.1,
+            stream=True
+        )
+
+        async for chunk in response:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+    except Exception as e:
+        yield f"❌ Rewrite error: {str(e)}"
+
+def _iter_stream_sync(agen):
+    """Bridge an async generator on the persistent loop to a sync iterator,
+    as st.write_stream consumes synchronously on the script thread."""
+    loop = get_event_loop()
+    while True:
+        try:
+            yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+        except StopAsyncIteration:
+            break
+
 # ============================================================================
 # UI COMPONENTS
 # ============================================================================
 
-def render_sidebar():
-    """Sidebar with storage, navigation, and system status."""
-    with st.sidebar:
-        st.markdown("### 🏠 Home")
-        
-        # System activity moved under home
-        if 'system_logs' in st.session_state and st.session_state['system_logs']:
-            with st.expander("📊 System Activity", expanded=False):
-                recent_logs = st.session_state['system_logs'][-5:]
-                for log in recent_logs:
-                    # Clean up log display
-                    if ']' in log:
-                        clean_log = log.split(']', 1)[1].strip()
-                        if ':' in clean_log:
-                            parts = clean_log.split(':', 1)
-                            if len(parts) > 1:
-                                clean_log = parts[1].strip()
-                    else:
-                        clean_log = log
-                    st.caption(clean_log)
-        
-        st.markdown("---")
-        
-        # System status
-        st.markdown("### ⚙️ System Status")
-        if client:
-            st.success("✅ AI Analysis Ready")
-            
-            # Check GitHub documentation access
-            style_guide_status = "✅" if fetch_documentation("style_guide") else "❌"
-            content_guide_status = "✅" if fetch_documentation("content_classification_guide") else "❌"
-            
-            st.markdown(f"**Style Guides:**")
-            st.markdown(f"{style_guide_status} Style Guide")
-            st.markdown(f"{content_guide_status} Content Guide")
-            
-        else:
-            st.warning("⚠️ AI Analysis Disabled")
-            st.caption("Add OPENAI_API_KEY to .env")
-        
-        st.markdown("---")
-        
-        # Quick Stats as dropdown
-        df = get_reviews()
-        with st.expander("📊 Quick Stats", expanded=False):
-            if not df.empty:
-                st.metric("Total Reviews", len(df))
-                st.metric("This Week", len(df[df['timestamp'] >= (datetime.now() - pd.Timedelta(days=7)).strftime("%Y-%m-%d")]))
-                
-                # Recent doc types
-                recent_types = df['document_type'].value_counts().head(3)
-                st.caption("**Recent Types:**")
-                for doc_type, count in recent_types.items():
-                    st.caption(f"• {doc_type}: {count}")
-            else:
-                st.info("No reviews yet")
-        
-        st.markdown("---")
-        
-        # Cache management
-        if st.button("🧹 Clear Cache", use_container_width=True, key="clear_cache_btn"):
-            DOCS_CACHE.clear()
-            st.success("Documentation cache cleared")
-            log_system_message("SYSTEM: Documentation cache cleared")
+@st.cache_resource(show_spinner=False)
+def _header_html():
+    """Static main-header HTML, built once per process.
 
-def main():
-    """Main application."""
-    
-    # Initialize database
-    init_database()
-    
-    # Render sidebar
-    render_sidebar()
-    
-    # Main header
-    st.markdown("""
+    Self-contained (styles inlined) because components.html renders into
+    an iframe where the page CSS doesn't reach; emitting via the
+    component path skips the server-side markdown parse entirely.
+    """
+    return """
+    <style>
+        body { margin: 0; font-family: "Source Sans Pro", sans-serif; }
+        .main-header {
+            text-align: center;
+            padding: 2rem 0;
+            background: linear-gradient(135deg, #f8fafc 0%, #e0f2fe 50%, #e8eaf6 100%);
+            border-radius: 1rem;
+        }
+        .gradient-text {
+            background: linear-gradient(135deg, #1e293b, #1e40af, #3730a3);
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+            font-size: 3rem;
+            font-weight: bold;
+            margin-bottom: 1rem;
+        }
+        .badge {
+            display: inline-block;
+            padding: 0.25rem 0.75rem;
+            border-radius: 1rem;
+            font-size: 0.875rem;
+            font-weight: 500;
+            margin: 0.25rem;
+        }
+        .badge-ai { background: #dbeafe; color: #1e40af; border: 1px solid #bfdbfe; }
+        .badge-secure { background: #dcfce7; color: #166534; border: 1px solid #bbf7d0; }
+        .badge-realtime { background: #f3e8ff; color: #7c3aed; border: 1px solid #ddd6fe; }
+    </style>
     <div class="main-header">
         <div style="font-size: 3rem; margin-bottom: 1rem;">📄</div>
         <h1 class="gradient-text">Documentation MultiAgent</h1>
         <p style="font-size: 1.2rem; color: #64748b; max-width: 600px; margin: 0 auto; line-height: 1.6;">
-            Multi-agent AI platform with GitHub-enforced style guides for comprehensive technical writing review. 
+            Multi-agent AI platform with GitHub-enforced style guides for comprehensive technical writing review.
             Content Analyzer, Style Guide Enforcer, and Senior Editor agents work together to improve your documentation.
         </p>
         <div style="margin-top: 1.5rem;">
@@ -905,13 +1241,107 @@ def main():
             <span class="badge badge-realtime">⏱️ Real-time</span>
         </div>
     </div>
-    """, unsafe_allow_html=True)
+    """
+
+@st.cache_resource(show_spinner=False)
+def _footer_html():
+    """Static footer HTML, built once per process."""
+    return (
+        "<p style='text-align: center; color: #64748b; margin: 0; "
+        "font-family: \"Source Sans Pro\", sans-serif;'>"
+        "🚀 Powered by Advanced AI Agents | 📧 support@docmultiagent.com</p>"
+    )
+
+@st.fragment
+def render_sidebar():
+    """Sidebar contents, run as a fragment.
+
+    Main-panel clicks no longer re-execute the DB queries and doc
+    checks in here; only sidebar-originated interactions (like the
+    Clear Cache button) rerun this block. Must be called from inside
+    the st.sidebar container, since fragments cannot write outside
+    their own.
+    """
+    st.markdown("### 🏠 Home")
+    
+    # System activity moved under home — entries are pre-cleaned at
+    # insertion, so this is a single join + one markdown element
+    if _LOG_BUFFER:
+        with st.expander("📊 System Activity", expanded=False):
+            recent_logs = list(_LOG_BUFFER)[-5:]
+            st.markdown("\n".join(f"- {entry['clean']}" for entry in recent_logs))
+    
+    # System status — one markdown element per state instead of a
+    # separator, a heading, and a line per guide
+    if get_openai():
+        # Check GitHub documentation access
+        style_guide_status = "✅" if has_doc("style_guide") else "❌"
+        content_guide_status = "✅" if has_doc("content_classification_guide") else "❌"
+
+        st.markdown(
+            "---\n\n"
+            "### ⚙️ System Status\n\n"
+            "✅ **AI Analysis Ready**\n\n"
+            "**Style Guides:**\n\n"
+            f"- {style_guide_status} Style Guide\n"
+            f"- {content_guide_status} Content Guide\n\n"
+            "---"
+        )
+    else:
+        st.markdown(
+            "---\n\n"
+            "### ⚙️ System Status\n\n"
+            "⚠️ **AI Analysis Disabled** — add OPENAI_API_KEY to .env\n\n"
+            "---"
+        )
+    
+    # Quick Stats as dropdown — reads precomputed aggregates
+    stats = _reviews_stats(_reviews_version())
+    with st.expander("📊 Quick Stats", expanded=False):
+        if stats['total']:
+            st.metric("Total Reviews", stats['total'])
+            st.metric("This Week", stats['week'])
+
+            # Recent doc types
+            st.caption("**Recent Types:**")
+            for doc_type, count in stats['top_types'].items():
+                st.caption(f"• {doc_type}: {count}")
+        else:
+            st.info("No reviews yet")
+    
+    st.markdown("---")
+    
+    # Cache management
+    if st.button("🧹 Clear Cache", use_container_width=True, key="clear_cache_btn"):
+        st.cache_data.clear()
+        _doc_presence.clear()
+        _AI_RESULT_CACHE.clear()
+        st.success("Documentation cache cleared")
+        log_system_message("SYSTEM: Documentation cache cleared")
+
+def main():
+    """Main application."""
+    
+    # Initialize database
+    ensure_schema()
+
+    # Warm the documentation cache and OpenAI connection once per session,
+    # off the UI thread so first paint isn't delayed
+    if not st.session_state.get('docs_warmed'):
+        threading.Thread(target=_prewarm, daemon=True).start()
+        st.session_state['docs_warmed'] = True
+
+    # Render sidebar
+    with st.sidebar:
+        render_sidebar()
+    
+    # Main header — cached string straight to the component channel, no
+    # markdown parse/sanitize per rerun
+    components.html(_header_html(), height=320, scrolling=False)
     
     # Initialize session state
     if 'analysis_results' not in st.session_state:
         st.session_state['analysis_results'] = None
-    if 'system_logs' not in st.session_state:
-        st.session_state['system_logs'] = []
     
     # Document input section
     st.markdown("## 📤 Document Analysis")
@@ -974,69 +1404,78 @@ For more examples, see our tutorial at https://docs.example.com/tutorials/gettin
                     else:
                         result = "✅ **No immediate issues found!**"
                     
+                    # render_results() runs later in this same pass, so
+                    # no rerun is needed to show what's already in state
                     st.session_state['analysis_results'] = {
                         'type': 'Quick Analysis',
                         'content': result
                     }
-                    st.rerun()
         
         with col2:
             if st.button("🤖 AI Analysis + Rewrite", type="primary", use_container_width=True, key="ai_analysis_rewrite_btn"):
-                if client:
-                    with st.spinner("Running AI analysis and generating rewrite..."):
+                if get_openai():
+                    # A repeat click on unchanged inputs skips the OpenAI
+                    # round trips entirely and replays the cached pair
+                    ai_key = (doc_title, doc_type, document_text)
+                    cached = _AI_RESULT_CACHE.get(ai_key)
+                    if cached is not None:
+                        analysis, rewrite = cached
+                    else:
                         progress_bar = st.progress(0)
                         status_text = st.empty()
-                        
-                        # Run analysis and rewrite in parallel
-                        status_text.text("🔍 Running AI analysis...")
-                        progress_bar.progress(25)
-                        
-                        async def run_parallel_analysis():
-                            # Run analysis, link validation, and rewrite
-                            status_text.text("🔍 Running content & style analysis...")
-                            progress_bar.progress(20)
-                            
-                            analysis_task = multi_agent_analysis(document_text, doc_title, doc_type)
-                            
-                            # Wait for analysis to complete first (includes link validation)
-                            analysis_result = await analysis_task
-                            
-                            progress_bar.progress(70)
-                            status_text.text("✏️ Generating improved version...")
-                            
-                            # Then run rewrite based on analysis
-                            rewrite_task = generate_rewrite(
-                                document_text, 
-                                doc_title, 
-                                doc_type, 
-                                analysis_result.get('review', 'Analysis completed'), 
-                                analysis_result
-                            )
-                            rewrite_result = await rewrite_task
-                            
-                            return analysis_result, rewrite_result
-                        
-                        analysis, rewrite = asyncio.run(run_parallel_analysis())
-                        
+
+                        # Analysis first (includes link validation); the
+                        # rewrite depends on its synthesized review
+                        status_text.text("🔍 Running content & style analysis...")
+                        progress_bar.progress(20)
+                        analysis = run_async(multi_agent_analysis(document_text, doc_title, doc_type))
+
+                        progress_bar.progress(70)
+                        status_text.text("✏️ Generating improved version...")
+                        feedback = (
+                            analysis.get('review', 'Analysis completed')
+                            if isinstance(analysis, dict) else str(analysis)
+                        )
+
+                        # Stream the rewrite into a placeholder so the user
+                        # reads tokens as they arrive; write_stream returns
+                        # the accumulated text for session state
+                        st.markdown("### ✏️ Improved Version (live)")
+                        placeholder = st.empty()
+                        with placeholder.container():
+                            rewrite = st.write_stream(_iter_stream_sync(
+                                generate_rewrite_stream(
+                                    document_text, doc_title, doc_type, feedback, analysis
+                                )
+                            ))
+
                         progress_bar.progress(100)
                         status_text.text("✅ Analysis, link validation, and rewrite completed!")
-                        
-                        # Store combined results
-                        st.session_state['analysis_results'] = {
-                            'type': 'AI Analysis + Rewrite',
-                            'rewrite': rewrite,
-                            'analysis': analysis,
-                            'document': document_text,
-                            'title': doc_title,
-                            'doc_type': doc_type
-                        }
-                        
-                        # Save to database
-                        save_review(doc_type, doc_title, document_text, analysis)
-                        
+
+                        # Only cache successful runs — a transient API
+                        # failure should retry on the next click, not be
+                        # replayed for an hour
+                        if isinstance(analysis, dict) and 'review' in analysis:
+                            _AI_RESULT_CACHE[ai_key] = (analysis, rewrite)
+
+                        # Persist off the UI thread; results are already
+                        # headed for session state so the render doesn't
+                        # wait on the disk. Cache replays don't re-save.
+                        save_review_async(doc_type, doc_title, document_text, analysis)
+
                         progress_bar.empty()
                         status_text.empty()
-                        st.rerun()
+                        placeholder.empty()
+
+                    # Store combined results
+                    st.session_state['analysis_results'] = {
+                        'type': 'AI Analysis + Rewrite',
+                        'rewrite': rewrite,
+                        'analysis': analysis,
+                        'document': document_text,
+                        'title': doc_title,
+                        'doc_type': doc_type
+                    }
                 else:
                     st.error("❌ AI analysis requires OpenAI API key configuration.")
     
@@ -1044,11 +1483,51 @@ For more examples, see our tutorial at https://docs.example.com/tutorials/gettin
         st.warning("⚠️ Please add a document title to enable analysis.")
     elif not document_text:
         st.info("👆 Enter your document content above to begin analysis.")
-    
+
+    # Batch mode: upload several files and review them all concurrently
+    with st.expander("📚 Batch Review (multiple files)", expanded=False):
+        uploads = st.file_uploader(
+            "Upload markdown or text files",
+            type=["md", "markdown", "txt"],
+            accept_multiple_files=True,
+            key="batch_files"
+        )
+        if uploads and st.button("🤖 Review All", type="primary", key="batch_review_btn"):
+            if get_openai():
+                docs = [
+                    (f.getvalue().decode("utf-8", errors="replace"),
+                     {"title": f.name, "type": "Other"})
+                    for f in uploads
+                ]
+                with st.spinner(f"Reviewing {len(docs)} document(s)..."):
+                    batch_results = run_async(review_all(docs))
+                for upload, result in zip(uploads, batch_results):
+                    with st.expander(f"📄 {upload.name}", expanded=False):
+                        if isinstance(result, dict) and "review" in result:
+                            st.markdown(result["review"])
+                        else:
+                            error = result.get("error", "Review failed") if isinstance(result, dict) else str(result)
+                            st.error(f"❌ {error}")
+            else:
+                st.error("❌ AI analysis requires OpenAI API key configuration.")
+
     # Display results directly on the same page
-    if st.session_state.get('analysis_results'):
-        results = st.session_state['analysis_results']
-        
+    render_results()
+
+    # Footer
+    st.markdown("---")
+    components.html(_footer_html(), height=40, scrolling=False)
+
+@st.fragment
+def render_results():
+    """Results panel, isolated as a fragment.
+
+    Clicks on the copy/download buttons inside it rerun only this block
+    instead of re-transmitting the whole page — the results markdown is
+    by far the largest payload on a rerun.
+    """
+    results = st.session_state.get('analysis_results')
+    if results:
         st.markdown("---")
         st.markdown(f"## 📋 {results['type']} Results")
         
@@ -1099,10 +1578,10 @@ For more examples, see our tutorial at https://docs.example.com/tutorials/gettin
                 st.rerun()
         
         with col2:
-            if results['type'] == 'AI Analysis' and client:
+            if results['type'] == 'AI Analysis' and get_openai():
                 if st.button("✏️ Get Rewrite", key="get_rewrite"):
                     with st.spinner("Generating improved version..."):
-                        rewrite_result = asyncio.run(
+                        rewrite_result = run_async(
                             generate_rewrite(
                                 results.get('document', ''),
                                 results.get('title', ''),
@@ -1134,13 +1613,6 @@ For more examples, see our tutorial at https://docs.example.com/tutorials/gettin
                     mime="text/markdown",
                     key="download_results"
                 )
-    
-    # Footer
-    st.markdown("---")
-    st.markdown(
-        "<p style='text-align: center; color: #64748b;'>🚀 Powered by Advanced AI Agents | 📧 support@docmultiagent.com</p>",
-        unsafe_allow_html=True
-    )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file